@@ -1,30 +1,37 @@
-from django.contrib import admin
-from django.urls import path, include
-from base.views.product_views import product_list_create, product_detail, product_update_stock, upload_product_image, insert_sample_products
-from .settings import MEDIA_ROOT, MEDIA_URL
-from django.conf.urls.static import static
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
-from base.views.image_views import images_in_folder
+from django.conf import settings
+from django.urls import path, re_path, include
+from base.urls.lazy import lazy_view
 
-urlpatterns = [
-    path('admin/', admin.site.urls),
+# Views are imported on the first request to their route (base/urls/lazy.py),
+# so a cold start only pays for the route it serves.
+products = 'base.views.product_views.'
 
+urlpatterns = [
     # Products (function-based)
-    path('api/products/', product_list_create, name='product-list-create'),
-    path('api/products/<int:pk>/', product_detail, name='product-detail'),
-    path('api/products/<int:pk>/stock/', product_update_stock, name='product-update-stock'),
-    path('api/products/<int:pk>/image/', upload_product_image, name='product-upload-image'),
-    path('api/products/insert-sample-products/', insert_sample_products, name='insert-sample-products'),
+    path('api/products/', lazy_view(products + 'product_list_create'), name='product-list-create'),
+    path('api/products/facets/', lazy_view(products + 'product_facets'), name='product-facets'),
+    path('api/products/<int:pk>/', lazy_view(products + 'product_detail'), name='product-detail'),
+    path('api/products/<int:pk>/stock/', lazy_view(products + 'product_update_stock'), name='product-update-stock'),
+    path('api/products/<int:pk>/image/', lazy_view(products + 'upload_product_image'), name='product-upload-image'),
+    path('api/products/<int:pk>/reviews/', lazy_view('base.views.review_views.product_reviews'), name='product-reviews'),
+    path('api/products/insert-sample-products/', lazy_view(products + 'insert_sample_products'), name='insert-sample-products'),
 
-    path('api/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/login/', lazy_view('rest_framework_simplejwt.views.TokenObtainPairView'), name='token_obtain_pair'),
+    path('api/token/refresh/', lazy_view('rest_framework_simplejwt.views.TokenRefreshView'), name='token_refresh'),
     path('api/users/', include('base.urls.user_urls')),
     path('api/orders/', include('base.urls.order_urls')),
-    path("api/images/", images_in_folder, name="list-folder-images"),
+    path("api/images/", lazy_view('base.views.image_views.images_in_folder'), name="list-folder-images"),
+    path("api/metrics/", lazy_view('base.views.metrics_views.metrics'), name="metrics"),
 ]
 
+# Not part of the API-only profile (settings.API_ONLY)
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    from django.contrib import admin
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
 
-urlpatterns += static(MEDIA_URL, document_root=MEDIA_ROOT)
+
+# Media (product images): served by Django in production too, with cache headers,
+# 304s, byte ranges and sendfile-friendly FileResponse (see base/views/media_views.py)
+urlpatterns += [
+    re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), lazy_view('base.views.media_views.serve_media', csrf_exempt=False), name='media'),
+]
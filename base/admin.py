@@ -9,3 +9,6 @@ admin.site.register(Review)
 admin.site.register(OrderItem)
 admin.site.register(Order)
 admin.site.register(ShippingAddress)
+admin.site.register(Job)
+admin.site.register(MediaBlob)
+admin.site.register(ProductFacetCount)
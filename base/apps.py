@@ -5,4 +5,5 @@ class BaseConfig(AppConfig):
     name = 'base'
 
     def ready(self):
-        from .signals import insert_initial_data
\ No newline at end of file
+        from .signals import insert_initial_data
+        from . import tasks  # registers background tasks with the job queue
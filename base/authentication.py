@@ -0,0 +1,92 @@
+from functools import cached_property
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+from .services.password_service import PasswordService
+from .services.user_cache_service import UserCacheService
+
+
+class ClaimsUser(TokenUser):
+    """
+    request.user built from a verified access token, without a query.
+
+    Reads the claims added by MyTokenObtainPairSerializer.get_token
+    (`name` holds the username, plus `email`, `first_name`, `is_staff`).
+    Tokens issued before a claim existed fall back to the User row through
+    UserCacheService, as does `model` for code that needs the real object.
+    """
+
+    @cached_property
+    def id(self):
+        # simplejwt stores the id as a string; serializers and cache keys expect the pk type
+        user_id = super().id
+        return int(user_id) if isinstance(user_id, str) and user_id.isdigit() else user_id
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    def _claim(self, claim, attr):
+        if claim in self.token:
+            return self.token[claim]
+        user = self.model
+        return getattr(user, attr) if user is not None else None
+
+    @cached_property
+    def model(self):
+        return UserCacheService.get(self.id)
+
+    @cached_property
+    def username(self) -> str:
+        return self._claim('name', 'username') or ''
+
+    @cached_property
+    def email(self) -> str:
+        return self._claim('email', 'email') or ''
+
+    @cached_property
+    def first_name(self) -> str:
+        return self._claim('first_name', 'first_name') or ''
+
+    @cached_property
+    def is_staff(self) -> bool:
+        return bool(self._claim('is_staff', 'is_staff'))
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWTAuthentication without the per-request User lookup: the signature
+    and expiry are verified as usual, then request.user is a ClaimsUser.
+
+    Trade-off: a user who is deactivated or loses is_staff keeps access
+    until their access token expires (SIMPLE_JWT ACCESS_TOKEN_LIFETIME).
+    """
+
+    def get_user(self, validated_token):
+        super().get_user(validated_token)  # rejects tokens without a user id claim
+        return ClaimsUser(validated_token)
+
+
+class PooledPasswordBackend(ModelBackend):
+    """
+    ModelBackend (used by the login views and the admin) with the password
+    check done on PasswordService's bounded thread pool.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # hash anyway, so an unknown username takes as long as a wrong password
+            PasswordService.make_password(password)
+        else:
+            if PasswordService.check_password(user, password) and self.user_can_authenticate(user):
+                return user
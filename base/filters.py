@@ -0,0 +1,76 @@
+import math
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class RangeFilter(BaseFilterBackend):
+    """
+    Numeric range query params, declared as `param -> (field, lookup)`:
+
+        range_fields = {'min_price': ('price', 'gte')}
+
+    Blank params are skipped; anything that isn't a finite number is a 400.
+    """
+    range_fields = {}
+
+    def get_lookups(self, request) -> dict:
+        lookups = {}
+        errors = {}
+        for param, (field, lookup) in self.range_fields.items():
+            raw = (request.query_params.get(param) or '').strip()
+            if not raw:
+                continue
+            try:
+                value = float(raw)
+            except ValueError:
+                value = None
+            if value is None or not math.isfinite(value):
+                errors[param] = ['A number is required.']
+                continue
+            lookups[f'{field}__{lookup}'] = value
+        if errors:
+            raise ValidationError(errors)
+        return lookups
+
+    def filter_queryset(self, request, queryset, view=None):
+        lookups = self.get_lookups(request)
+        return queryset.filter(**lookups) if lookups else queryset
+
+
+class IndexedOrderingFilter(BaseFilterBackend):
+    """
+    `?ordering=field` / `?ordering=-field`, limited to `ordering_fields`.
+
+    Each allowed field must have an index on (field, id): the id breaks
+    ties, so pages are stable and the sort can be read off the index
+    instead of sorting the table. Unknown values are ignored, like the
+    user list's ?ordering=.
+    """
+    ordering_param = 'ordering'
+    ordering_fields = ()
+
+    def get_ordering(self, request):
+        value = (request.query_params.get(self.ordering_param) or '').strip()
+        field = value.lstrip('-')
+        if field not in self.ordering_fields:
+            return None
+        prefix = '-' if value.startswith('-') else ''
+        return [prefix + field, prefix + 'id']
+
+    def filter_queryset(self, request, queryset, view=None):
+        ordering = self.get_ordering(request)
+        return queryset.order_by(*ordering) if ordering else queryset
+
+
+class ProductRangeFilter(RangeFilter):
+    range_fields = {
+        'min_price': ('price', 'gte'),
+        'max_price': ('price', 'lte'),
+        'min_rating': ('rating', 'gte'),
+    }
+
+
+class ProductOrderingFilter(IndexedOrderingFilter):
+    # see the product_*_idx indexes on Product
+    ordering_fields = ('price', 'rating', 'createdAt', 'numReviews')
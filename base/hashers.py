@@ -0,0 +1,28 @@
+"""
+Password hashers with parameters from settings.PASSWORD_HASHER_PARAMS,
+selected by settings.PASSWORD_HASHER (see api/settings.py).
+
+They keep Django's algorithm names, so hashes stay interchangeable with the
+stock hashers, and changing a parameter makes Django re-hash the password
+on the user's next login (must_update).
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+def _params(name) -> dict:
+    return getattr(settings, 'PASSWORD_HASHER_PARAMS', {}).get(name, {})
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id; needs the argon2-cffi package."""
+    time_cost = _params('argon2').get('time_cost', Argon2PasswordHasher.time_cost)
+    memory_cost = _params('argon2').get('memory_cost', Argon2PasswordHasher.memory_cost)
+    parallelism = _params('argon2').get('parallelism', Argon2PasswordHasher.parallelism)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = _params('scrypt').get('work_factor', ScryptPasswordHasher.work_factor)
+    block_size = _params('scrypt').get('block_size', ScryptPasswordHasher.block_size)
+    parallelism = _params('scrypt').get('parallelism', ScryptPasswordHasher.parallelism)
+    maxmem = _params('scrypt').get('maxmem', ScryptPasswordHasher.maxmem)
@@ -0,0 +1,177 @@
+import json
+import math
+import platform
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from base.models import Order, Product
+from base.services.synthetic_data_service import SyntheticDataService
+
+BENCH_PASSWORD = 'bench-password'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the REST API hot paths against a throwaway test database "
+        "filled with a synthetic catalog and order history. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=10000, help='Synthetic catalog size (10k-1M).')
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--orders-per-user', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per scenario.')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Only run the named scenario (repeatable).')
+        parser.add_argument('--warm-cache', action='store_true',
+                            help='Keep the response cache between requests (default: cleared before each one).')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database afterwards.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, keepdb=options['keepdb'], serialize=False)
+        try:
+            report = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
+
+    def run(self, options):
+        started = time.perf_counter()
+        SyntheticDataService.generate_catalog(options['products'], seed=options['seed'])
+        users = SyntheticDataService.generate_users(options['users'], password=BENCH_PASSWORD)
+        SyntheticDataService.generate_orders(users, options['orders_per_user'], seed=options['seed'])
+        setup_seconds = time.perf_counter() - started
+        self.stderr.write(f"Generated {Product.objects.count()} products, {Order.objects.count()} orders "
+                          f"in {setup_seconds:.1f}s")
+
+        client = Client()
+        user = users[0]
+        token = self.login(client, user)
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        product_id = Product.objects.order_by('-id').values_list('id', flat=True).first()
+        order_id = Order.objects.filter(user=user).values_list('id', flat=True).first()
+        deep_page = max(1, Product.objects.count() // 8 // 2)
+
+        scenarios = {
+            'products_page_1': ('get', '/api/products/', {}),
+            'products_deep_page': ('get', f'/api/products/?page={deep_page}', {}),
+            'products_cursor': ('get', '/api/products/?pagination=cursor', {}),
+            'products_search': ('get', '/api/products/?q=wireless', {}),
+            'products_filter': ('get', '/api/products/?brand=apple&category=audio&ordering=-price', {}),
+            'product_detail': ('get', f'/api/products/{product_id}/', {}),
+            'orders_list': ('get', '/api/orders/', auth),
+            'orders_history': ('get', '/api/orders/history/?summary=true', auth),
+            'order_detail': ('get', f'/api/orders/{order_id}', auth),
+            'login': ('post', '/api/users/login/', {
+                'data': {'username': user.username, 'password': BENCH_PASSWORD},
+                'content_type': 'application/json',
+            }),
+        }
+        selected = options['scenarios'] or list(scenarios)
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            raise SystemExit(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+        results = {}
+        for name in selected:
+            method, url, kwargs = scenarios[name]
+            results[name] = self.measure(client, method, url, kwargs, options)
+            self.stderr.write(f"{name}: p50={results[name]['p50_ms']}ms queries={results[name]['queries_mean']}")
+
+        return {
+            'meta': {
+                'commit': self.git_commit(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'products': options['products'],
+                'users': options['users'],
+                'orders_per_user': options['orders_per_user'],
+                'requests': options['requests'],
+                'warm_cache': options['warm_cache'],
+                'seed': options['seed'],
+                'setup_seconds': round(setup_seconds, 2),
+            },
+            'scenarios': results,
+        }
+
+    def login(self, client, user):
+        response = client.post('/api/login/', {'username': user.username, 'password': BENCH_PASSWORD},
+                               content_type='application/json')
+        return response.json()['access']
+
+    def measure(self, client, method, url, kwargs, options):
+        kwargs = dict(kwargs)
+        data = kwargs.pop('data', None)
+        cache = caches['default']
+
+        def call():
+            if not options['warm_cache']:
+                cache.clear()
+            if method == 'post':
+                return client.post(url, data, **kwargs)
+            return client.get(url, **kwargs)
+
+        for _ in range(options['warmup']):
+            call()
+
+        timings, query_counts, statuses = [], [], {}
+        wall_start = time.perf_counter()
+        for _ in range(options['requests']):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = call()
+                timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries))
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        wall = time.perf_counter() - wall_start
+
+        timings.sort()
+        return {
+            'url': url,
+            'requests': len(timings),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'throughput_rps': round(len(timings) / wall, 1) if wall else None,
+            'queries_mean': round(sum(query_counts) / len(query_counts), 2),
+            'queries_max': max(query_counts),
+            'status_codes': statuses,
+        }
+
+    def git_commit(self):
+        try:
+            return subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                stderr=subprocess.DEVNULL, text=True,
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,238 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.test import RequestFactory
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from base.management.commands.bench_api import percentile
+from base.models import Product
+
+# Connection settings compared per backend (environment read by api/settings.py).
+# The first mode of each backend is the old behaviour: a new connection per request.
+MODES = {
+    'sqlite': {
+        'per-request': {'DB_CONN_MAX_AGE': '0', 'SQLITE_WAL': '0'},
+        'persistent': {'DB_CONN_MAX_AGE': '600', 'SQLITE_WAL': '0'},
+        'wal': {'SQLITE_WAL': '1'},
+    },
+    'postgresql': {
+        'per-request': {'DB_POOL': '0', 'DB_CONN_MAX_AGE': '0'},
+        'persistent': {'DB_POOL': '0', 'DB_CONN_MAX_AGE': '60'},
+        'pool': {'DB_POOL': '1'},
+    },
+}
+
+DEFAULT_PATHS = ('/api/products/', '/api/products/{id}/')
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests/sec of the product API under concurrent load for each database connection "
+        "mode (per-request connections vs persistent vs pool / SQLite WAL). Every mode runs "
+        "in its own process; SQLite runs against throwaway copies of the database. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', action='append', dest='modes', help='Only run the named mode (repeatable).')
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per mode, over all threads.')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Path to request, "{id}" is replaced by a product id (repeatable).')
+        parser.add_argument('--writers', type=int, default=0,
+                            help='Threads doing stock updates during the run (SQLite copies only).')
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+        parser.add_argument('--worker', action='store_true', help='Internal: run one mode in this process.')
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            setup_test_environment()  # lets RequestFactory's host through ALLOWED_HOSTS
+            try:
+                self.stdout.write(json.dumps(self.run_worker(options)))
+            finally:
+                teardown_test_environment()
+            return
+
+        vendor = connection.vendor
+        if vendor not in MODES:
+            raise CommandError(f"No connection modes to compare for {vendor}.")
+        if vendor != 'sqlite' and options['writers']:
+            raise CommandError("--writers only runs against throwaway SQLite copies.")
+        modes = options['modes'] or list(MODES[vendor])
+        unknown = set(modes) - set(MODES[vendor])
+        if unknown:
+            raise CommandError(f"Unknown mode(s): {', '.join(sorted(unknown))}")
+
+        workdir = tempfile.mkdtemp(prefix='bench-db-') if vendor == 'sqlite' else None
+        try:
+            template = self.prepare_sqlite(workdir) if workdir else None
+            results = {}
+            for mode in modes:
+                env = dict(os.environ, **MODES[vendor][mode])
+                if template:
+                    # WAL sticks to the file, so every mode gets a fresh copy
+                    copy = os.path.join(workdir, f'{mode}.sqlite3')
+                    shutil.copyfile(template, copy)
+                    env['DATABASE_URL'] = f'sqlite:///{copy}'
+                results[mode] = self.run_mode(env, options)
+                self.stderr.write(f"{mode}: {results[mode]['requests_per_sec']} req/s "
+                                  f"p50={results[mode]['p50_ms']}ms p95={results[mode]['p95_ms']}ms")
+        finally:
+            if workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        baseline = results.get(modes[0], {}).get('requests_per_sec')
+        for result in results.values():
+            result['speedup'] = round(result['requests_per_sec'] / baseline, 2) if baseline else None
+
+        report = {
+            'meta': {
+                'database': vendor,
+                'threads': options['threads'],
+                'requests': options['requests'],
+                'writers': options['writers'],
+                'paths': list(options['paths'] or DEFAULT_PATHS),
+                'baseline': modes[0],
+            },
+            'modes': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
+
+    def prepare_sqlite(self, workdir):
+        """Copy the configured database and bring the copy up to date."""
+        source = str(settings.DATABASES['default']['NAME'])
+        template = os.path.join(workdir, 'template.sqlite3')
+        shutil.copyfile(source, template)
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{template}', SQLITE_WAL='0')
+        subprocess.run([sys.executable, 'manage.py', 'migrate', '--verbosity', '0'],
+                       env=env, cwd=str(settings.BASE_DIR), check=True)
+        return template
+
+    def run_mode(self, env, options):
+        command = [
+            sys.executable, 'manage.py', 'bench_db', '--worker',
+            '--threads', str(options['threads']), '--requests', str(options['requests']),
+            '--writers', str(options['writers']),
+        ]
+        for path in options['paths'] or ():
+            command += ['--path', path]
+        proc = subprocess.run(command, env=env, cwd=str(settings.BASE_DIR), capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise CommandError(proc.stderr.strip() or 'worker failed')
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+    # ---- worker (one mode, one process) ----
+
+    def run_worker(self, options):
+        ids = list(Product.objects.order_by('id').values_list('id', flat=True)[:100]) or [1]
+        paths = [
+            path.format(id=pk) if '{id}' in path else path
+            for path in (options['paths'] or DEFAULT_PATHS) for pk in ids
+        ]
+        threads = max(1, options['threads'])
+        per_thread = max(1, options['requests'] // threads)
+        latencies = []
+        errors = []
+        opened = []
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        # Through the real WSGI handler, not django.test.Client: the test client
+        # disconnects close_old_connections from request_started/finished, so
+        # CONN_MAX_AGE=0 would never actually reconnect per request.
+        handler = get_wsgi_application()
+        factory = RequestFactory()
+
+        def get(path):
+            status = []
+            response = handler(factory.get(path).environ, lambda code, headers: status.append(code))
+            try:
+                b''.join(response)
+            finally:
+                response.close()  # request_finished
+            return int(status[0].split()[0])
+
+        def count_connection(sender, connection, **kwargs):
+            with lock:
+                opened.append(connection.alias)
+
+        def reader(offset):
+            local = []
+            try:
+                for i in range(per_thread):
+                    path = paths[(offset + i) % len(paths)]
+                    started = time.perf_counter()
+                    status_code = get(path)
+                    local.append((time.perf_counter() - started) * 1000)
+                    if status_code >= 400:
+                        errors.append(f'{path}: {status_code}')
+            finally:
+                connections.close_all()
+                with lock:
+                    latencies.extend(local)
+
+        def writer():
+            try:
+                i = 0
+                while not stop.is_set():
+                    Product.objects.filter(pk=ids[i % len(ids)]).update(countInStock=F('countInStock'))
+                    i += 1
+            finally:
+                connections.close_all()
+
+        # the response cache would hide the database entirely
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            get(paths[0])  # warm up imports / URLconf
+            connection_created.connect(count_connection)
+            writers = [threading.Thread(target=writer) for _ in range(options['writers'])]
+            readers = [threading.Thread(target=reader, args=(n * 7,)) for n in range(threads)]
+            started = time.perf_counter()
+            for thread in writers + readers:
+                thread.start()
+            for thread in readers:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            stop.set()
+            for thread in writers:
+                thread.join()
+            connection_created.disconnect(count_connection)
+
+        if errors:
+            raise CommandError(f"{len(errors)} failed requests, e.g. {errors[0]}")
+        latencies.sort()
+        db = settings.DATABASES['default']
+        return {
+            'conn_max_age': db.get('CONN_MAX_AGE', 0),
+            'pool': db.get('OPTIONS', {}).get('pool'),
+            'journal_mode': self.journal_mode(),
+            'requests': len(latencies),
+            # with per-request connections this is about one per request (plus writers)
+            'connections_opened': len(opened),
+            'seconds': round(elapsed, 3),
+            'requests_per_sec': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+        }
+
+    def journal_mode(self):
+        if connection.vendor != 'sqlite':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            return cursor.fetchone()[0]
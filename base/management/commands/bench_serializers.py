@@ -0,0 +1,108 @@
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from base.models import Product
+from base.serializers import ProductListSerializer, ProductSerializer
+
+# what the listing cards read
+CARD_FIELDS = ['_id', 'name', 'image', 'price', 'rating']
+
+
+class Command(BaseCommand):
+    help = (
+        "Time ProductSerializer(many=True) against ProductListSerializer (the list fast path) "
+        "on in-memory pages, with every field and with the card fieldset. No database needed. "
+        "Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='8,24,50,100', help='Comma-separated page sizes.')
+        parser.add_argument('--repeat', type=int, default=200, help='Serializations per measurement.')
+        parser.add_argument('--runs', type=int, default=5, help='Measurements per case (median is reported).')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()  # lets RequestFactory's host through ALLOWED_HOSTS
+        try:
+            self.run(options)
+        finally:
+            teardown_test_environment()
+
+    def run(self, options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        rng = random.Random(options['seed'])
+        products = self.products(max(sizes), rng)
+        request = Request(RequestFactory().get('/api/products/'))
+        context = {'request': request}
+
+        cases = {
+            'drf': lambda page, fields: ProductSerializer(page, many=True, context=context, fields=fields).data,
+            'lean': lambda page, fields: ProductListSerializer(page, context=context, fields=fields).data,
+        }
+        results = []
+        for size in sizes:
+            page = products[:size]
+            for fieldset, fields in (('all', None), ('cards', CARD_FIELDS)):
+                row = {'page_size': size, 'fields': fieldset}
+                outputs = {}
+                for name, serialize in cases.items():
+                    outputs[name] = [dict(item) for item in serialize(page, fields)]
+                    row[f'{name}_us'] = self.measure(lambda: serialize(page, fields), options)
+                if outputs['drf'] != outputs['lean']:
+                    raise SystemExit(f"Outputs differ for page_size={size} fields={fieldset}")
+                row['speedup'] = round(row['drf_us'] / row['lean_us'], 2) if row['lean_us'] else None
+                row['bytes'] = len(JSONRenderer().render(outputs['lean']))
+                results.append(row)
+                self.stderr.write(f"{size:>4} {fieldset:<5} drf={row['drf_us']}us lean={row['lean_us']}us "
+                                  f"x{row['speedup']} {row['bytes']}B")
+
+        output = json.dumps({'repeat': options['repeat'], 'runs': options['runs'], 'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
+
+    def measure(self, func, options):
+        """Median microseconds per call."""
+        samples = []
+        for _ in range(max(1, options['runs'])):
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                func()
+            samples.append((time.perf_counter() - started) / options['repeat'] * 1e6)
+        return round(statistics.median(samples), 1)
+
+    def products(self, count, rng):
+        now = timezone.now()
+        products = []
+        for i in range(count):
+            variants = [
+                {'name': f'derived/p{i}-{width}w.{ext}', 'width': width, 'type': f'image/{ext}'}
+                for width in (320, 640, 1024) for ext in ('avif', 'webp')
+            ] if i % 2 else []
+            products.append(Product(
+                id=i + 1,
+                name=f'Product {i}',
+                image=f'blobs/{i % 256:02x}/00/p{i}.jpg',
+                imageVariants=variants,
+                imageStatus='ready' if variants else '',
+                description=' '.join(rng.choices(['lorem', 'ipsum', 'dolor', 'sit', 'amet'], k=40)),
+                brand='Brand', category='Category',
+                price=round(rng.uniform(5, 3000), 2),
+                countInStock=rng.randint(0, 500),
+                rating=round(rng.uniform(1, 5), 1),
+                numReviews=rng.randint(0, 2000),
+                createdAt=now - timedelta(minutes=i),
+            ))
+        return products
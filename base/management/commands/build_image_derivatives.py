@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from base.models import Product
+from base.services.image_service import ImageService
+
+
+class Command(BaseCommand):
+    help = "Build (or rebuild) the responsive WebP/AVIF derivatives of product images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='Product ids (default: every product with an image).')
+        parser.add_argument('--missing', action='store_true', help='Only products without derivatives yet.')
+
+    def handle(self, *args, **options):
+        qs = Product.objects.exclude(image='').exclude(image__isnull=True).order_by('id')
+        if options['ids']:
+            qs = qs.filter(id__in=options['ids'])
+        if options['missing']:
+            qs = qs.filter(imageVariants=[])
+
+        built = 0
+        for product in qs.iterator(chunk_size=100):
+            variants = ImageService.build_derivatives(product)
+            built += bool(variants)
+            self.stdout.write(f"#{product.pk} {product.image.name}: {len(variants)} variants")
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {built} products."))
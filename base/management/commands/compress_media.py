@@ -0,0 +1,35 @@
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from base.views.media_views import COMPRESSIBLE_TYPES
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+
+class Command(BaseCommand):
+    help = "Write .gz (and .br, if the brotli package is installed) copies of compressible media files."
+
+    def handle(self, *args, **options):
+        written = 0
+        for root, _, files in os.walk(settings.MEDIA_ROOT):
+            for filename in files:
+                if mimetypes.guess_type(filename)[0] not in COMPRESSIBLE_TYPES:
+                    continue
+                path = os.path.join(root, filename)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                with open(path + '.gz', 'wb') as f:
+                    f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                written += 1
+                if brotli is not None:
+                    with open(path + '.br', 'wb') as f:
+                        f.write(brotli.compress(data))
+                    written += 1
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} precompressed files."))
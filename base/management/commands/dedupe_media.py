@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from base.models import Product
+
+
+class Command(BaseCommand):
+    help = "Move legacy product uploads into the content-addressed blob store, sharing identical files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete-originals', action='store_true', help='Remove each legacy file once no product uses it.')
+
+    def handle(self, *args, **options):
+        storage = Product._meta.get_field('image').storage
+        moved = {}
+        qs = Product.objects.exclude(image='').exclude(image__isnull=True).exclude(image__startswith='blobs/')
+        for product in qs.order_by('id').iterator(chunk_size=100):
+            old_name = product.image.name
+            # "/images/..." are seeded references to bundled files, not uploads
+            if old_name.startswith('/') or not storage.exists(old_name):
+                continue
+            if old_name not in moved:
+                with storage.open(old_name, 'rb') as f:
+                    moved[old_name] = storage.save(old_name, f)
+            product.image.name = moved[old_name]
+            # the post_save receivers take the blob reference
+            product.save(update_fields=['image', 'updatedAt'])
+            self.stdout.write(f"#{product.pk} {old_name} -> {moved[old_name]}")
+
+        if options['delete_originals']:
+            for old_name in moved:
+                if not Product.objects.filter(image=old_name).exists():
+                    storage.delete(old_name)
+
+        blobs = len(set(moved.values()))
+        self.stdout.write(self.style.SUCCESS(f"Moved {len(moved)} files into {blobs} blobs."))
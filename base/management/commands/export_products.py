@@ -0,0 +1,53 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base.services.catalog_service import FORMATS, CatalogService
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the product catalog to a JSON Lines or CSV file (or stdout), ordered by id. "
+        "The output can be read back with import_products."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help='File to write, or "-" for stdout (default).')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the output extension, else jsonl.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per database round trip.')
+        parser.add_argument('--progress-every', type=int, default=10000, help='Rows between progress lines.')
+
+    def handle(self, *args, **options):
+        path = options['output']
+        fmt = options['format'] or self.guess_format(path)
+        started = time.perf_counter()
+        rows = 0
+
+        file = None if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+        write = file.write if file else lambda line: self.stdout.write(line, ending='')
+        try:
+            for i, line in enumerate(CatalogService.export_lines(fmt, chunk_size=max(1, options['chunk_size']))):
+                write(line)
+                if fmt == 'csv' and i == 0:
+                    continue  # header
+                rows += 1
+                if options['progress_every'] and rows % options['progress_every'] == 0:
+                    elapsed = time.perf_counter() - started
+                    self.stderr.write(f"{rows} rows, {rows / elapsed:.0f} rows/s")
+        finally:
+            if file:
+                file.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {rows} rows in {elapsed:.1f}s, {rows / elapsed if elapsed else 0:.0f} rows/s."
+        ))
+
+    def guess_format(self, path):
+        ext = os.path.splitext(path)[1].lower().lstrip('.')
+        if ext in ('jsonl', 'ndjson', ''):
+            return 'jsonl'
+        if ext == 'csv':
+            return 'csv'
+        raise CommandError("Can't tell the format from the file name; pass --format.")
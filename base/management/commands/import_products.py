@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base.services.catalog_service import FORMATS, CatalogService
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a JSON Lines or CSV product catalog into the database, inserting new products "
+        "and updating existing ones (matched by id) in fixed-size batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Catalog file, or "-" for stdin.')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension (jsonl/ndjson or csv).')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--progress-every', type=int, default=10000, help='Rows between progress lines.')
+        parser.add_argument('--max-errors', type=int, default=100,
+                            help='Give up after this many unreadable rows (they are skipped until then).')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or self.guess_format(options['path'])
+        batch_size = max(1, options['batch_size'])
+        totals = {'inserted': 0, 'updated': 0, 'unindexed': 0, 'skipped': 0}
+        rows = 0
+        started = time.perf_counter()
+
+        file = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8', newline='')
+        try:
+            batch = []
+            for line_no, record in CatalogService.read(file, fmt):
+                try:
+                    batch.append(CatalogService.product_from_record(record))
+                except (TypeError, ValueError) as e:
+                    self.skip(line_no, e, totals, options['max_errors'])
+                    continue
+                rows += 1
+                if len(batch) >= batch_size:
+                    self.write(batch, totals)
+                    batch = []
+                if options['progress_every'] and rows % options['progress_every'] == 0:
+                    elapsed = time.perf_counter() - started
+                    self.stderr.write(f"{rows} rows, {rows / elapsed:.0f} rows/s")
+            if batch:
+                self.write(batch, totals)
+        finally:
+            if file is not sys.stdin:
+                file.close()
+            # also when stopping early: the batches written so far are committed
+            if totals['inserted'] or totals['updated']:
+                CatalogService.finish(rebuild_search=bool(totals['unindexed']))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {rows} rows ({totals['inserted']} inserted, {totals['updated']} updated, "
+            f"{totals['skipped']} skipped) in {elapsed:.1f}s, {rows / elapsed if elapsed else 0:.0f} rows/s."
+        ))
+
+    def guess_format(self, path):
+        ext = os.path.splitext(path)[1].lower().lstrip('.')
+        if ext in ('jsonl', 'ndjson'):
+            return 'jsonl'
+        if ext == 'csv':
+            return 'csv'
+        raise CommandError("Can't tell the format from the file name; pass --format.")
+
+    def skip(self, line_no, error, totals, max_errors):
+        totals['skipped'] += 1
+        self.stderr.write(f"line {line_no}: skipped ({error})")
+        if totals['skipped'] > max_errors:
+            raise CommandError(f"More than {max_errors} bad rows; stopping. Earlier batches are saved.")
+
+    def write(self, batch, totals):
+        for key, count in CatalogService.upsert(batch).items():
+            totals[key] += count
@@ -0,0 +1,128 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter per sample, like a new serverless instance:
+# import the WSGI module (what Vercel does for api/wsgi.py), then send it one
+# request. Timings go to stdout as JSON, -X importtime writes to stderr.
+PROBE = r'''
+import json, sys, time
+from importlib import import_module
+from io import BytesIO
+
+module_path, _, attr = sys.argv[1].rpartition('.')
+path, method = sys.argv[2], sys.argv[3]
+
+start = time.perf_counter()
+app = getattr(import_module(module_path), attr)
+imported = time.perf_counter()
+
+status = []
+environ = {
+    'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': '',
+    'SERVER_NAME': '127.0.0.1', 'SERVER_PORT': '80', 'HTTP_HOST': '127.0.0.1',
+    'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.input': BytesIO(),
+    'wsgi.errors': sys.stderr, 'wsgi.multithread': False, 'wsgi.multiprocess': True,
+    'wsgi.run_once': False, 'wsgi.version': (1, 0),
+}
+body = b''.join(app(environ, lambda s, headers, exc_info=None: status.append(s)))
+done = time.perf_counter()
+
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_request_ms': (done - imported) * 1000,
+    'status': status[0] if status else None,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def parse_importtime(stderr):
+    """(module, self us, cumulative us) for every `-X importtime` line."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace('import time:', '|', 1).split('|')]
+        rows.append((name, int(self_us), int(cumulative_us)))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold-start cost of the WSGI entry point (settings.WSGI_APPLICATION): "
+        "import time and first-request time, each in a fresh interpreter. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to sample.')
+        parser.add_argument('--path', default='/api/products/', help='Path of the first request.')
+        parser.add_argument('--method', default='GET')
+        parser.add_argument('--api-only', action='store_true', help='Run with DJANGO_API_ONLY=1 (lean profile).')
+        parser.add_argument('--top', type=int, default=15, help='Slowest modules to list (by self time).')
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env['DJANGO_SETTINGS_MODULE'] = os.environ.get('DJANGO_SETTINGS_MODULE', 'api.settings')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+        if options['api_only']:
+            env['DJANGO_API_ONLY'] = '1'
+        else:
+            env.pop('DJANGO_API_ONLY', None)
+
+        samples = []
+        modules = {}
+        for _ in range(max(1, options['runs'])):
+            started = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', PROBE,
+                 settings.WSGI_APPLICATION, options['path'], options['method']],
+                env=env, cwd=str(settings.BASE_DIR), capture_output=True, text=True,
+            )
+            wall_ms = (time.perf_counter() - started) * 1000
+            if proc.returncode != 0:
+                raise CommandError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'probe failed')
+            sample = json.loads(proc.stdout.strip().splitlines()[-1])
+            sample['process_ms'] = wall_ms
+            samples.append(sample)
+            for name, self_us, _ in parse_importtime(proc.stderr):
+                modules.setdefault(name, []).append(self_us)
+
+        def summary(key):
+            values = [s[key] for s in samples]
+            return {
+                'median': round(statistics.median(values), 2),
+                'min': round(min(values), 2),
+                'max': round(max(values), 2),
+            }
+
+        slowest = sorted(
+            ((name, statistics.median(times)) for name, times in modules.items()),
+            key=lambda item: item[1], reverse=True,
+        )[:options['top']]
+
+        report = {
+            'wsgi_application': settings.WSGI_APPLICATION,
+            'api_only': bool(options['api_only']),
+            'path': options['path'],
+            'runs': len(samples),
+            'status': samples[-1]['status'],
+            'modules_loaded': samples[-1]['modules'],
+            'import_ms': summary('import_ms'),
+            'first_request_ms': summary('first_request_ms'),
+            'process_ms': summary('process_ms'),
+            'slowest_modules_ms': [{'module': name, 'self_ms': round(us / 1000, 2)} for name, us in slowest],
+        }
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
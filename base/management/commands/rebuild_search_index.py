@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from base.models import Product
+from base.services.search_service import ProductSearchService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product full-text search index from the base_product table."
+
+    def handle(self, *args, **options):
+        ProductSearchService.reset_availability_cache()
+        if not ProductSearchService.is_available():
+            self.stderr.write("Search index table not found for this database backend; nothing to do.")
+            return
+        ProductSearchService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {Product.objects.count()} products."))
@@ -0,0 +1,49 @@
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from base.services.job_service import JobService
+
+
+class Command(BaseCommand):
+    help = "Process background jobs from the base_job table with a pool of worker threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when idle.')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty.')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        threads = options['threads']
+        processed = 0
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='run_jobs') as executor:
+            while not self.stopping:
+                JobService.requeue_stale()
+                jobs = JobService.claim(limit=threads * 2)
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                results = list(executor.map(self.run_job, jobs))
+                processed += len(results)
+                self.stdout.write(f"Processed {len(results)} jobs ({results.count(False)} failed)")
+
+        self.stdout.write(self.style.SUCCESS(f"Worker stopped after {processed} jobs."))
+
+    def run_job(self, job):
+        close_old_connections()
+        try:
+            return JobService.run(job)
+        finally:
+            close_old_connections()
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .services.metrics_service import MetricsService
+
+
+class QueryCounter():
+    """`connection.execute_wrapper` hook counting and timing every SQL statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, SQL query count and SQL time per route into
+    MetricsService (exposed on /api/metrics/) and, unless
+    SERVER_TIMING_HEADER is False, reports them in a Server-Timing header.
+
+    Routes are labelled by URL pattern (`api/products/<int:pk>/`), not by
+    path, and unknown HTTP methods as "other", so the number of series
+    stays bounded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'SERVER_TIMING_HEADER', True)
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match is not None and match.route else 'unmatched'
+        MetricsService.record(route, request.method, duration, counter.count, counter.duration)
+
+        if self.server_timing:
+            response.headers['Server-Timing'] = (
+                f'app;dur={duration * 1000:.1f}, '
+                f'db;dur={counter.duration * 1000:.1f};desc="{counter.count} queries"'
+            )
+        return response
@@ -0,0 +1,68 @@
+# Full-text search index for products.
+#
+# SQLite gets an FTS5 virtual table, PostgreSQL a tsvector table with a GIN
+# index. Both are keyed on the product id and kept in sync from the Product
+# post_save/post_delete receivers in base/signals.py.
+
+from django.db import migrations, models
+
+
+POSTGRES_DOCUMENT_SQL = (
+    "setweight(to_tsvector('simple', COALESCE(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', COALESCE(brand, '')), 'B') || "
+    "setweight(to_tsvector('simple', COALESCE(category, '')), 'C') || "
+    "setweight(to_tsvector('simple', COALESCE(description, '')), 'D')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS base_product_fts USING fts5("
+            "name, description, brand, category, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        schema_editor.execute(
+            "INSERT INTO base_product_fts(rowid, name, description, brand, category) "
+            "SELECT id, COALESCE(name, ''), COALESCE(description, ''), "
+            "COALESCE(brand, ''), COALESCE(category, '') FROM base_product"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS base_product_search ("
+            "product_id bigint PRIMARY KEY REFERENCES base_product(id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS base_product_search_document_gin "
+            "ON base_product_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO base_product_search(product_id, document) "
+            f"SELECT id, {POSTGRES_DOCUMENT_SQL} FROM base_product"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS base_product_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE IF EXISTS base_product_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0002_product_user_alter_product_brand_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='price',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_product_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-createdAt', '-id'], name='product_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_product_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='updatedAt',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='updatedAt',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
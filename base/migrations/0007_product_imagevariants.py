@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_order_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='imageVariants',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0007_product_imagevariants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='imageStatus',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('maxAttempts', models.IntegerField(default=3)),
+                ('runAt', models.DateTimeField()),
+                ('startedAt', models.DateTimeField(blank=True, null=True)),
+                ('lastError', models.TextField(blank=True, default='')),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('updatedAt', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'runAt'], name='job_status_run_at_idx')],
+            },
+        ),
+    ]
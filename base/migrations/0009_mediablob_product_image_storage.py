@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:40
+
+import base.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0008_job_product_imagestatus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('refCount', models.IntegerField(default=0)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=base.storage.product_image_storage, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:53
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_rating_sum(apps, schema_editor):
+    # seeded ratings become the starting point of the running sum
+    Product = apps.get_model('base', 'Product')
+    Product.objects.update(ratingSum=F('rating') * F('numReviews'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0009_mediablob_product_image_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='ratingSum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_sum, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='review',
+            name='createdAt',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', '-createdAt', '-id'], name='review_product_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('product', 'user'), name='review_product_user_unique'),
+        ),
+    ]
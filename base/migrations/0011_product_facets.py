@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:56
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0010_review_createdat_product_ratingsum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='brandKey',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('brand')), output_field=models.CharField(max_length=100)),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='categoryKey',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('category')), output_field=models.CharField(max_length=100)),
+        ),
+        migrations.CreateModel(
+            name='ProductFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('brandKey', models.CharField(blank=True, default='', max_length=100)),
+                ('categoryKey', models.CharField(blank=True, default='', max_length=100)),
+                ('priceBucket', models.SmallIntegerField()),
+                ('brand', models.CharField(blank=True, default='', max_length=100)),
+                ('category', models.CharField(blank=True, default='', max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['categoryKey', 'brandKey'], name='facet_category_brand_idx')],
+                'constraints': [models.UniqueConstraint(fields=('brandKey', 'categoryKey', 'priceBucket'), name='facet_cell_unique')],
+            },
+        ),
+    ]
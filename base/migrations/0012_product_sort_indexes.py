@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0011_product_facets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-rating', '-id'], name='product_rating_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-numReviews', '-id'], name='product_reviews_id_idx'),
+        ),
+    ]
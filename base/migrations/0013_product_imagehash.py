@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0012_product_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='imageHash',
+            field=models.CharField(blank=True, default='', max_length=12),
+        ),
+    ]
@@ -1,35 +1,103 @@
 from django.db import models
+from django.db.models.functions import Lower, Trim
 from django.contrib.auth.models import User
 
+from .storage import product_image_storage
+
 class Product(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     # Django will create an auto-increment integer primary key `id`
     name = models.CharField(max_length=255, blank=True, null=True)
-    image = models.ImageField(blank=True, null=True)
+    # content-addressed: identical uploads share one file (see base/storage.py)
+    image = models.ImageField(blank=True, null=True, storage=product_image_storage)
+    # resized WebP/AVIF copies of `image`, see base/services/image_service.py
+    imageVariants = models.JSONField(default=list, blank=True)
+    # derivatives are built by a background job; clients poll this
+    imageStatus = models.CharField(max_length=20, blank=True, default='')
+    # content hash for the URL of a non-blob image (see MediaService.url), stored when the derivatives are built
+    imageHash = models.CharField(max_length=12, blank=True, default='')
     description = models.TextField(blank=True, null=True)
     brand = models.CharField(max_length=100, blank=True, null=True)
     category = models.CharField(max_length=100, blank=True, null=True)
+    # case-normalized copies kept by the database itself (bulk_create and
+    # queryset updates included); brand/category filters and facets use these
+    brandKey = models.GeneratedField(
+        expression=Lower(Trim('brand')), output_field=models.CharField(max_length=100),
+        db_persist=True, db_index=True,
+    )
+    categoryKey = models.GeneratedField(
+        expression=Lower(Trim('category')), output_field=models.CharField(max_length=100),
+        db_persist=True, db_index=True,
+    )
 
     price = models.FloatField(default=0)
     countInStock = models.IntegerField(default=0)
 
     rating = models.FloatField(default=0)       # or DecimalField if you want exact decimals
     numReviews = models.IntegerField(default=0)
+    # running sum of review ratings; rating = ratingSum / numReviews (see review_service)
+    ratingSum = models.FloatField(default=0)
 
     createdAt = models.DateTimeField(auto_now_add=True)
+    # bumped on every save(); feeds the ETag / Last-Modified of product reads
+    updatedAt = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-createdAt']
+        indexes = [
+            # backs KeysetPaginator's (createdAt, id) seek on the catalog
+            models.Index(fields=['-createdAt', '-id'], name='product_created_id_idx'),
+            # ?ordering= sort keys and ?min_price= / ?max_price= / ?min_rating= (base/filters.py)
+            models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+            models.Index(fields=['-rating', '-id'], name='product_rating_id_idx'),
+            models.Index(fields=['-numReviews', '-id'], name='product_reviews_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name} (#{self.pk})'
 
+class ProductFacetCount(models.Model):
+    """
+    Product counts per (brand, category, price bucket), rebuilt from the
+    catalog after product writes (see base/services/facet_service.py).
+    Facet counts for brand/category filters are sums over this table
+    instead of a GROUP BY over every product.
+    """
+    brandKey = models.CharField(max_length=100, blank=True, default='')
+    categoryKey = models.CharField(max_length=100, blank=True, default='')
+    priceBucket = models.SmallIntegerField()
+    # display labels: one of the spellings used by the products in the cell
+    brand = models.CharField(max_length=100, blank=True, default='')
+    category = models.CharField(max_length=100, blank=True, default='')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['brandKey', 'categoryKey', 'priceBucket'], name='facet_cell_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['categoryKey', 'brandKey'], name='facet_category_brand_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.brandKey}/{self.categoryKey}/{self.priceBucket}: {self.count}'
+
 class Review(models.Model):
     product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     name = models.CharField(max_length=255, blank=True, null=True)
     rating = models.FloatField(default=0)       # or DecimalField if you want exact decimals
     comment = models.TextField(blank=True, null=True)
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # per-product review pages, newest first (keyset on createdAt, id)
+            models.Index(fields=['product', '-createdAt', '-id'], name='review_product_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'user'], name='review_product_user_unique'),
+        ]
 
     def __str__(self):
         return str(self.rating)
@@ -45,6 +113,13 @@ class Order(models.Model):
     isDelivered = models.BooleanField(default=False)
     deliveredAt = models.DateTimeField(auto_now_add=False, blank=True, null=True)
     createdAt = models.DateTimeField(auto_now_add=True)
+    updatedAt = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # a customer's order history, newest first (see order_history)
+            models.Index(fields=['user', '-createdAt', '-id'], name='order_user_created_idx'),
+        ]
 
     def __str__(self):
         return str(self.createdAt)
@@ -76,3 +151,42 @@ class ShippingAddress(models.Model):
 
     def __str__(self):
         return str(self.address)
+
+
+class Job(models.Model):
+    """A unit of background work, see base/services/job_service.py."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.IntegerField(default=0)
+    maxAttempts = models.IntegerField(default=3)
+    runAt = models.DateTimeField()
+    startedAt = models.DateTimeField(blank=True, null=True)
+    lastError = models.TextField(blank=True, default='')
+    createdAt = models.DateTimeField(auto_now_add=True)
+    updatedAt = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # workers poll for due queued jobs
+            models.Index(fields=['status', 'runAt'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+
+class MediaBlob(models.Model):
+    """Reference count of a content-addressed image file (base/services/blob_service.py)."""
+    name = models.CharField(max_length=255, unique=True)
+    refCount = models.IntegerField(default=0)
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.name} ({self.refCount})'
@@ -0,0 +1,154 @@
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPaginator(BasePagination):
+    """
+    Keyset (a.k.a. cursor / seek) pagination.
+
+    Instead of COUNT(*) + OFFSET, each page is fetched with a
+    `WHERE (createdAt, id) < (last seen createdAt, last seen id)` condition,
+    so page N costs the same as page 1 as long as `ordering` is backed by an
+    index. The last ordering field must be unique (the pk) to act as a
+    tiebreaker for rows that share a timestamp.
+
+    The total count is skipped unless the client asks for it with ?count=true.
+    """
+    page_size = 8
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = ('-createdAt', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = None
+
+        position, self.reverse = self.decode_cursor(request)
+        self.has_cursor = position is not None
+
+        if self.include_count(request):
+            self.count = queryset.count()
+
+        ordering = self._ordering(reverse=self.reverse)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(queryset.model, position, ordering))
+
+        # one extra row tells us whether there is another page in this direction
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        if self.reverse:
+            self.has_next = self.has_cursor
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.has_cursor
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        body = {}
+        if self.count is not None:
+            body['count'] = self.count
+        body['next'] = self.get_next_link()
+        body['previous'] = self.get_previous_link()
+        body['results'] = data
+        return Response(body)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, TypeError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def include_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    # ---- cursor encoding ----
+
+    def _field_names(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, obj, reverse):
+        values = [
+            obj._meta.get_field(name).value_to_string(obj) for name in self._field_names()
+        ]
+        tokens = {'p': values}
+        if reverse:
+            tokens['r'] = '1'
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            values = tokens['p']
+            reverse = tokens.get('r', ['0'])[0] == '1'
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    # ---- seek condition ----
+
+    def _ordering(self, reverse):
+        if not reverse:
+            return list(self.ordering)
+        return [name[1:] if name.startswith('-') else '-' + name for name in self.ordering]
+
+    def _seek_filter(self, model, raw_values, ordering):
+        """
+        Lexicographic "comes after" condition for the given ordering:
+        (a > x) OR (a = x AND b > y) OR ... with < for descending fields.
+        """
+        names = [name.lstrip('-') for name in ordering]
+        try:
+            values = [
+                model._meta.get_field(name).to_python(raw) for name, raw in zip(names, raw_values)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal_prefix = {}
+        for name, value, order in zip(names, values, ordering):
+            lookup = 'lt' if order.startswith('-') else 'gt'
+            condition |= Q(**equal_prefix, **{f'{name}__{lookup}': value})
+            equal_prefix[name] = value
+        return condition
@@ -1,22 +1,79 @@
 # products/serializers.py
 from rest_framework import serializers
-from .models import Product, Order, OrderItem, ShippingAddress
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from .models import Product, Order, OrderItem, Review, ShippingAddress
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.utils.encoding import iri_to_uri
+from .services.image_service import ImageService
+from .services.media_service import MediaService
+
+# ProductSerializer fields that don't read a column of the same name (for ?fields= / .only())
+PRODUCT_FIELD_COLUMNS = {
+    '_id': ('id',),
+    'image': ('image', 'imageHash'),
+    'imageSources': ('imageVariants',),
+}
+
+
+def product_image_url(obj, build_url):
+    if not obj.image:
+        return None
+    # content-hashed, so clients and CDNs can cache it forever
+    return build_url(MediaService.url(ImageService.source_name(obj), obj.imageHash))
+
+
+def product_image_sources(obj, build_url):
+    # [{"type": "image/avif", "srcset": "... 320w, ... 640w"}, {"type": "image/webp", ...}]
+    if not obj.imageVariants:
+        return []
+    return ImageService.sources(
+        obj.imageVariants, lambda name, content_hash: build_url(MediaService.url(name, content_hash)),
+    )
+
 
 class ProductSerializer(serializers.ModelSerializer):
     _id = serializers.IntegerField(source='id', read_only=True)
     image = serializers.SerializerMethodField()
+    imageSources = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = [
-            '_id', 'name', 'image', 'description', 'brand', 'category',
+            '_id', 'name', 'image', 'imageSources', 'imageStatus', 'description', 'brand', 'category',
             'price', 'countInStock', 'rating', 'numReviews', 'createdAt'
         ]
-        read_only_fields = ['_id', 'createdAt']
+        # rating / numReviews are maintained from reviews (review_service)
+        read_only_fields = ['_id', 'imageStatus', 'rating', 'numReviews', 'createdAt']
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # sparse fieldset, see sparse_fields()
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def sparse_fields(cls, request):
+        """
+        `?fields=_id,name,image,price,rating` -> those names in Meta.fields
+        order; None when the param is absent (every field).
+        """
+        raw = request.query_params.get('fields')
+        if not raw:
+            return None
+        requested = {name.strip() for name in raw.split(',') if name.strip()}
+        unknown = requested - set(cls.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError({'fields': [f"Unknown field(s): {', '.join(sorted(unknown))}"]})
+        return [name for name in cls.Meta.fields if name in requested] or None
+
+    @staticmethod
+    def columns(fields) -> list:
+        """Product columns the given fields read, for queryset.only()."""
+        return [column for name in fields for column in PRODUCT_FIELD_COLUMNS.get(name, (name,))]
 
     def validate_price(self, value):
         if value < 0:
@@ -27,17 +84,71 @@ class ProductSerializer(serializers.ModelSerializer):
         if value < 0:
             raise serializers.ValidationError("countInStock must be ≥ 0.")
         return value
-    
+
+    def build_url(self, url):
+        request = self.context.get('request')
+        # If a request is available, build absolute URI
+        if request is not None:
+            return request.build_absolute_uri(url)
+        # Fallback if no request context is given
+        return url
+
     def get_image(self, obj):
+        return product_image_url(obj, self.build_url)
+
+    def get_imageSources(self, obj):
+        return product_image_sources(obj, self.build_url)
+
+class ProductListSerializer():
+    """
+    Read-only `ProductSerializer(many=True)` output for product list pages,
+    without DRF's per-field machinery: each row is a dict built from plain
+    attribute reads, and the scheme://host prefix of image URLs is worked
+    out once per page instead of once per URL. Keep the output identical
+    to ProductSerializer's.
+    """
+    # plain columns -> to_representation of their DRF field (None stays None)
+    PLAIN = {
+        'name': str, 'imageStatus': str, 'description': str, 'brand': str, 'category': str,
+        'price': float, 'countInStock': int, 'rating': float, 'numReviews': int,
+    }
+    _datetime = serializers.DateTimeField()
+
+    def __init__(self, instance, context=None, fields=None):
+        self.instance = instance
+        self.context = context or {}
+        self.fields = fields or ProductSerializer.Meta.fields
+
+    def _getter(self, name, build_url):
+        if name == '_id':
+            return lambda obj: obj.id
+        if name == 'image':
+            return lambda obj: product_image_url(obj, build_url)
+        if name == 'imageSources':
+            return lambda obj: product_image_sources(obj, build_url)
+        convert = self._datetime.to_representation if name == 'createdAt' else self.PLAIN[name]
+
+        def get(obj):
+            value = getattr(obj, name)
+            return None if value is None else convert(value)
+        return get
+
+    @property
+    def data(self) -> list:
         request = self.context.get('request')
-        if obj.image:
-            image_url = obj.image.url
-            # If a request is available, build absolute URI
-            if request is not None:
-                return request.build_absolute_uri(image_url)
-            # Fallback if no request context is given
-            return f"{settings.MEDIA_URL}{obj.image}"
-        return None
+        # what request.build_absolute_uri() does for "/..." paths
+        host = request.build_absolute_uri('/')[:-1] if request is not None else None
+
+        def build_url(url):
+            return url if host is None else iri_to_uri(host + url)
+
+        getters = [(name, self._getter(name, build_url)) for name in self.fields]
+        return [{name: get(obj) for name, get in getters} for obj in self.instance]
+
+class ProductImageStatusSerializer(ProductSerializer):
+    """What clients poll for after uploading an image."""
+    class Meta(ProductSerializer.Meta):
+        fields = ['_id', 'image', 'imageSources', 'imageStatus']
 
 class ProductUpdateSerializer(serializers.ModelSerializer):
     _id = serializers.IntegerField(source='id', read_only=True)
@@ -59,16 +170,31 @@ class ProductUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("countInStock must be ≥ 0.")
         return value
 
+def add_user_claims(token, user):
+    # Add custom claims (also what base.authentication.ClaimsUser reads)
+    token['name'] = user.username
+    token['email'] = user.email
+    token['first_name'] = user.first_name
+    token['is_staff'] = user.is_staff
+    return token
+
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
-        token = super().get_token(user)
-
-        # Add custom claims
-        token['name'] = user.username
-        token['email'] = user.email
+        return add_user_claims(super().get_token(user), user)
 
-        return token
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    simplejwt copies the refresh token's claims into the new access token;
+    take them from the User row instead, so a demotion or rename reaches
+    JWT_STATELESS requests at the next refresh rather than the next login.
+    """
+    def validate(self, attrs):
+        data = super().validate(attrs)  # rejects deleted / inactive users
+        access = AccessToken(data['access'])
+        user = User.objects.get(**{jwt_settings.USER_ID_FIELD: access[jwt_settings.USER_ID_CLAIM]})
+        data['access'] = str(add_user_claims(access, user))
+        return data
 
 class UserSerializer(serializers.ModelSerializer):
 
@@ -105,7 +231,11 @@ class UserSerializerWithToken(UserSerializer):
 
     # method to get additional field
     def get_token(self, obj):
-        token = RefreshToken.for_user(obj)
+        # login passes the access token it already minted
+        if self.context.get('token'):
+            return self.context['token']
+        # same claims as the login tokens, so stateless auth can rely on them
+        token = MyTokenObtainPairSerializer.get_token(obj)
         return str(token.access_token)
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -118,12 +248,68 @@ class OrderReadSerializer(serializers.ModelSerializer):
         model = Order
         fields = ["id", "user", "paymentMethod", "taxPrice", "shippingPrice", "totalPrice", "isPaid", "paidAt", "isDelivered", "deliveredAt", "createdAt"]
 
+class OrderSummarySerializer(OrderReadSerializer):
+    # filled in by SQL annotations (OrderService.order_history(summary=True))
+    itemCount = serializers.IntegerField(source='item_count', read_only=True)
+    itemsTotal = serializers.DecimalField(source='items_total', max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta(OrderReadSerializer.Meta):
+        fields = OrderReadSerializer.Meta.fields + ["itemCount", "itemsTotal"]
+
 class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ["product", "order", "name", "qty", "price", "image"]
 
+class OrderItemCreateSerializer(serializers.ModelSerializer):
+    # plain id instead of a PrimaryKeyRelatedField (one query per line);
+    # OrderService checks all products of the cart in a single query
+    product = serializers.IntegerField(source='product_id')
+    qty = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = OrderItem
+        fields = ["product", "name", "qty", "price", "image"]
+
+class ReviewSerializer(serializers.ModelSerializer):
+    _id = serializers.IntegerField(source='id', read_only=True)
+
+    class Meta:
+        model = Review
+        fields = ['_id', 'product', 'user', 'name', 'rating', 'comment', 'createdAt']
+
+class ReviewCreateSerializer(serializers.ModelSerializer):
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+
+    class Meta:
+        model = Review
+        fields = ['rating', 'comment']
+
 class ShippingSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShippingAddress
         fields = ["order", "address", "city", "postalCode", "country", "shippingPrice"]
+
+class OrderDetailSerializer(OrderReadSerializer):
+    """
+    Read-only order aggregate: order fields, the shipping address fields
+    merged in flat (the shape order_details has always returned) and the
+    items under "order_items".
+
+    Expects an order loaded by OrderService.load_order_aggregate(), so the
+    address and items are already in memory. Items emit `product` as the
+    raw product_id, which needs no Product lookup.
+    """
+    order_items = OrderItemSerializer(source='orderitem_set', many=True, read_only=True)
+
+    class Meta(OrderReadSerializer.Meta):
+        fields = OrderReadSerializer.Meta.fields + ["order_items"]
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        order_items = data.pop("order_items")
+        shipping = getattr(instance, "shippingaddress", None)
+        if shipping is not None:
+            data.update(ShippingSerializer(shipping).data)
+        data["order_items"] = order_items
+        return data
@@ -0,0 +1,42 @@
+import time
+
+from django.db import transaction
+from django.db.models import F
+
+from base.models import MediaBlob
+from base.storage import BLOB_PREFIX
+
+
+class BlobService():
+    """
+    Reference counts for content-addressed image blobs (base/storage.py).
+
+    Called from the Product receivers in base/signals.py whenever a
+    product starts or stops pointing at a blob. A blob whose count drops
+    to zero is handed to the delete_media_files job, which re-checks the
+    count before deleting anything, and leaves the file alone if an
+    upload stored the same bytes again in the meantime.
+    """
+
+    @staticmethod
+    def is_blob(name) -> bool:
+        return bool(name) and name.startswith(BLOB_PREFIX)
+
+    @staticmethod
+    def acquire(name):
+        if not BlobService.is_blob(name):
+            return
+        blob, created = MediaBlob.objects.get_or_create(name=name, defaults={'refCount': 1})
+        if not created:
+            MediaBlob.objects.filter(pk=blob.pk).update(refCount=F('refCount') + 1)
+
+    @staticmethod
+    def release(name):
+        if not BlobService.is_blob(name):
+            return
+        MediaBlob.objects.filter(name=name, refCount__gt=0).update(refCount=F('refCount') - 1)
+        if MediaBlob.objects.filter(name=name, refCount=0).exists():
+            from base.services.job_service import JobService
+            # delayed, so a re-upload of the same bytes can claim the blob back first
+            payload = {'names': [name], 'since': time.time()}
+            transaction.on_commit(lambda: JobService.enqueue('delete_media_files', payload, delay=60))
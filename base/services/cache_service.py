@@ -0,0 +1,171 @@
+import hashlib
+import time
+from calendar import timegm
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+# Query params that change what product_list_create returns. Anything else
+# is ignored by the view, so it is left out of the key as well (otherwise
+# `?utm_source=...` would bust the cache).
+LIST_PARAMS = ('q', 'brand', 'category', 'min_price', 'max_price', 'min_rating', 'ordering',
+               'page', 'page_size', 'pagination', 'cursor', 'count', 'fields')
+# Matched case-insensitively by the view (iexact / full-text search)
+CASE_INSENSITIVE_PARAMS = ('q', 'brand', 'category')
+
+_LIST_VERSION_KEY = 'products:version'
+
+
+class ProductCacheService():
+    """
+    Response cache for anonymous product reads.
+
+    Keys embed a version number: one for the whole catalog (list pages) and
+    one per product (detail). `invalidate()` bumps the versions, so stale
+    entries are never read again and simply age out. Eviction (LRU + TTL)
+    is left to the configured Django cache backend.
+    """
+
+    @staticmethod
+    def _cache():
+        return caches[getattr(settings, 'PRODUCT_CACHE_ALIAS', 'default')]
+
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'PRODUCT_CACHE_TIMEOUT', 300)
+
+    @staticmethod
+    def _version(version_key) -> int:
+        cache = ProductCacheService._cache()
+        version = cache.get(version_key)
+        if version is None:
+            # seeded from the clock rather than 1, so a version key that got
+            # evicted can't come back as a number old entries still carry
+            cache.add(version_key, time.time_ns(), timeout=None)
+            version = cache.get(version_key)
+        return version
+
+    @staticmethod
+    def _bump(version_key):
+        cache = ProductCacheService._cache()
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            # no version yet (or evicted)
+            cache.set(version_key, time.time_ns(), timeout=None)
+
+    @staticmethod
+    def normalized_query(request) -> str:
+        params = []
+        for name in LIST_PARAMS:
+            value = (request.query_params.get(name) or '').strip()
+            if not value:
+                continue
+            if name in CASE_INSENSITIVE_PARAMS:
+                value = value.lower()
+            params.append((name, value))
+        return urlencode(params)
+
+    @staticmethod
+    def list_key(request, **kwargs) -> str:
+        digest = hashlib.md5(ProductCacheService.normalized_query(request).encode()).hexdigest()
+        version = ProductCacheService._version(_LIST_VERSION_KEY)
+        # absolute URLs (images, next/previous) depend on the host
+        return f'products:list:v{version}:{request.get_host()}:{digest}'
+
+    @staticmethod
+    def detail_key(request, pk, **kwargs) -> str:
+        version = ProductCacheService._version(f'products:{pk}:version')
+        return f'products:detail:{pk}:v{version}:{request.get_host()}'
+
+    @staticmethod
+    def invalidate(pk=None):
+        """Called from the Product post_save/post_delete receivers."""
+        ProductCacheService._bump(_LIST_VERSION_KEY)
+        if pk is not None:
+            ProductCacheService._bump(f'products:{pk}:version')
+
+
+def cache_anonymous_get(key_func):
+    """
+    Cache the `Response.data` of successful anonymous GETs.
+
+    Goes *below* @api_view/@permission_classes so authentication and
+    permissions still run on every request. Put it *above*
+    @conditional_get: the ETag / Last-Modified are stored with the entry,
+    so a hit answers If-None-Match / If-Modified-Since itself and the
+    fingerprint query only runs on a miss.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            cache = ProductCacheService._cache()
+            key = key_func(request, *args, **kwargs)
+            entry = cache.get(key)
+            if entry is not None:
+                data, etag, timestamp = entry
+                response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+                if response is None:
+                    # imported here so the signals -> cache_service import at
+                    # startup doesn't load DRF's response/serializer modules
+                    from rest_framework.response import Response
+                    response = Response(data)
+                _set_validators(response, etag, timestamp)
+                return response
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                timestamp = parse_http_date_safe(response.headers.get('Last-Modified', ''))
+                entry = (response.data, response.headers.get('ETag'), timestamp)
+                cache.set(key, entry, ProductCacheService._timeout())
+            return response
+        return wrapped
+    return decorator
+
+
+def _set_validators(response, etag, timestamp):
+    if response.status_code in (200, 304):
+        if etag:
+            response.headers['ETag'] = etag
+        if timestamp is not None:
+            response.headers['Last-Modified'] = http_date(timestamp)
+
+
+def conditional_get(fingerprint_func):
+    """
+    ETag / Last-Modified support for GET and HEAD.
+
+    `fingerprint_func(request, *args, **kwargs)` returns
+    `(etag_source, last_modified)` from a cheap query (no serialization), or
+    None to skip conditional handling (e.g. the object doesn't exist and the
+    view should 404). A matching If-None-Match / If-Modified-Since
+    short-circuits to a 304 without calling the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            fingerprint = fingerprint_func(request, *args, **kwargs)
+            if fingerprint is None:
+                return view(request, *args, **kwargs)
+
+            etag_source, last_modified = fingerprint
+            etag = quote_etag(hashlib.md5(etag_source.encode()).hexdigest())
+            timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            _set_validators(response, etag, timestamp)
+            return response
+        return wrapped
+    return decorator
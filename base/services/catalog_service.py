@@ -0,0 +1,149 @@
+import csv
+import json
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from base.models import Product
+from base.services.blob_service import BlobService
+from base.services.cache_service import ProductCacheService
+from base.services.facet_service import FacetService
+from base.services.image_catalog_service import ImageCatalogService
+from base.services.search_service import ProductSearchService
+from base.streaming import csv_lines
+
+FORMATS = ('jsonl', 'csv')
+# columns of a catalog file, in export order
+CATALOG_FIELDS = ('id', 'name', 'image', 'description', 'brand', 'category',
+                  'price', 'countInStock', 'rating', 'numReviews')
+# what an import overwrites on existing products; rating / numReviews only
+# seed new rows, after that they belong to the reviews (review_service)
+UPSERT_FIELDS = ('name', 'image', 'description', 'brand', 'category', 'price', 'countInStock', 'updatedAt')
+
+_INTEGER_FIELDS = ('countInStock', 'numReviews')
+_FLOAT_FIELDS = ('price', 'rating')
+
+
+class CatalogService():
+    """
+    Streaming product catalog import/export (JSON Lines or CSV).
+
+    Files are read and written one row at a time and written to the
+    database in fixed-size batches, so memory stays flat however big the
+    catalog is. Each batch is one `INSERT ... ON CONFLICT (id) DO UPDATE`
+    in its own transaction: a failed import can simply be run again.
+    bulk_create skips the Product receivers, so every batch re-indexes its
+    rows for search and moves blob references itself, and `finish()`
+    does the catalog-wide work once at the end.
+    """
+
+    # ---- reading ----
+
+    @staticmethod
+    def read(file, fmt):
+        """
+        Yield (line number, record dict) from a text file. A JSON line that
+        doesn't parse comes through as (line number, the ValueError).
+        """
+        if fmt == 'csv':
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+            return
+        for line_no, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, e
+
+    @staticmethod
+    def product_from_record(record) -> Product:
+        """
+        Map a catalog record (a product.json entry, a JSONL line or a CSV
+        row) to an unsaved Product. Raises ValueError for bad numbers.
+        """
+        if not isinstance(record, dict):
+            raise ValueError(record if isinstance(record, ValueError) else 'not an object')
+        raw_id = record.get('id', record.get('_id'))
+        values = {'id': int(raw_id) if raw_id not in (None, '') else None}
+        for name in ('name', 'image', 'description', 'brand', 'category'):
+            values[name] = record.get(name) or ''
+        for name in _INTEGER_FIELDS:
+            values[name] = int(record.get(name) or 0)
+        for name in _FLOAT_FIELDS:
+            values[name] = float(record.get(name) or 0)
+        if values['price'] < 0 or values['countInStock'] < 0:
+            raise ValueError('price and countInStock must be >= 0')
+        values['ratingSum'] = values['rating'] * values['numReviews']
+        return Product(**values)
+
+    # ---- writing ----
+
+    @staticmethod
+    def upsert(products) -> dict:
+        """Insert or update one batch; returns inserted / updated / unindexed counts."""
+        # Postgres refuses to update the same row twice in one statement; last one wins
+        by_id = {}
+        new = []
+        for product in products:
+            if product.id is None:
+                new.append(product)
+            else:
+                by_id[product.id] = product
+        batch = list(by_id.values()) + new
+
+        with transaction.atomic():
+            previous_images = dict(Product.objects.filter(id__in=list(by_id)).values_list('id', 'image'))
+            Product.objects.bulk_create(
+                batch, update_conflicts=True, unique_fields=['id'], update_fields=list(UPSERT_FIELDS),
+            )
+
+            replaced = []
+            for product in batch:
+                old_image = previous_images.get(product.id)
+                if product.id in previous_images and (old_image or '') == (product.image.name or ''):
+                    continue
+                BlobService.acquire(product.image.name)
+                if product.id in previous_images:
+                    BlobService.release(old_image)
+                    replaced.append(product.id)
+            if replaced:
+                # derivatives of the old image; the upload view's job rebuilds them
+                Product.objects.filter(id__in=replaced).update(imageVariants=[], imageStatus='', imageHash='')
+
+            ids = [product.id for product in batch if product.id is not None]
+            ProductSearchService.index_products(ids)
+
+        return {
+            'inserted': len(batch) - len(previous_images),
+            'updated': len(previous_images),
+            # backends that can't return ids from a bulk insert leave these unindexed
+            'unindexed': len(batch) - len(ids),
+        }
+
+    @staticmethod
+    def finish(rebuild_search=False):
+        """After an import: sequences, search, facets and caches."""
+        # explicit ids don't advance the Postgres id sequence
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Product]):
+                cursor.execute(sql)
+        if rebuild_search:
+            ProductSearchService.rebuild()
+        FacetService.refresh()
+        ImageCatalogService.invalidate()
+        ProductCacheService.invalidate()
+
+    # ---- export ----
+
+    @staticmethod
+    def export_lines(fmt, chunk_size=2000):
+        """Yield the catalog as text lines (header first for CSV), ordered by id."""
+        rows = Product.objects.order_by('id').values_list(*CATALOG_FIELDS).iterator(chunk_size=chunk_size)
+        if fmt == 'csv':
+            yield from csv_lines(CATALOG_FIELDS, rows)
+            return
+        for row in rows:
+            yield json.dumps(dict(zip(CATALOG_FIELDS, row)), ensure_ascii=False) + '\n'
@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, CharField, Count, IntegerField, Min, Sum, Value, When
+from django.db.models.functions import Lower, Trim
+from django.utils import timezone
+
+from base.models import Job, Product, ProductFacetCount
+from base.services.search_service import ProductSearchService
+
+REFRESH_TASK = 'refresh_product_facets'
+# Product fields the facet counts depend on
+FACET_FIELDS = {'brand', 'category', 'price'}
+# a queued rebuild overdue by more than this is presumed stranded (e.g. the
+# process running the job thread died) and no longer holds back new ones
+REFRESH_PENDING_WINDOW = timedelta(minutes=1)
+
+
+class FacetService():
+    """
+    Brand / category / price-bucket counts for the catalog sidebar.
+
+    Counts come from ProductFacetCount, one row per (brand, category,
+    price bucket) cell, so a page view sums at most a few hundred rows
+    instead of grouping the whole catalog. The table is rebuilt by the
+    refresh_product_facets job after product writes; the job waits
+    PRODUCT_FACET_REFRESH_DELAY seconds, so every write in that window
+    shares one rebuild. A full-text `q` or a price/rating range
+    can't be answered from the cells; those requests group the matching
+    products directly (the ranges through the product_*_idx indexes).
+
+    Each facet ignores its own filter (brand counts are for the selected
+    category, not only the selected brand), so the sidebar keeps showing
+    the alternatives.
+    """
+
+    @staticmethod
+    def price_edges() -> tuple:
+        return tuple(getattr(settings, 'PRODUCT_PRICE_BUCKETS', (25, 50, 100, 250, 500, 1000)))
+
+    @staticmethod
+    def price_buckets() -> list:
+        """[{'bucket': 0, 'min': 0, 'max': 25}, ..., {'bucket': n, 'min': 1000, 'max': None}]"""
+        edges = FacetService.price_edges()
+        lows = (0,) + edges
+        highs = edges + (None,)
+        return [{'bucket': i, 'min': low, 'max': high} for i, (low, high) in enumerate(zip(lows, highs))]
+
+    @staticmethod
+    def bucket_expression():
+        edges = FacetService.price_edges()
+        return Case(
+            *[When(price__lt=edge, then=Value(i)) for i, edge in enumerate(edges)],
+            default=Value(len(edges)), output_field=IntegerField(),
+        )
+
+    @staticmethod
+    def key(value):
+        # normalized by the database, the same way as Product.brandKey / categoryKey
+        return Lower(Trim(Value(value, output_field=CharField())))
+
+    # ---- materialized counts ----
+
+    @staticmethod
+    def refresh():
+        """Rebuild ProductFacetCount with one GROUP BY over the catalog."""
+        rows = (
+            Product.objects.order_by()
+            .annotate(priceBucket=FacetService.bucket_expression())
+            .values('brandKey', 'categoryKey', 'priceBucket')
+            .annotate(count=Count('id'), brandLabel=Min('brand'), categoryLabel=Min('category'))
+        )
+        cells = [
+            ProductFacetCount(
+                brandKey=row['brandKey'] or '',
+                categoryKey=row['categoryKey'] or '',
+                priceBucket=row['priceBucket'],
+                brand=(row['brandLabel'] or '').strip(),
+                category=(row['categoryLabel'] or '').strip(),
+                count=row['count'],
+            )
+            for row in rows
+        ]
+        with transaction.atomic():
+            ProductFacetCount.objects.all().delete()
+            ProductFacetCount.objects.bulk_create(cells, batch_size=500)
+        return len(cells)
+
+    @staticmethod
+    def schedule_refresh():
+        """Queue a delayed rebuild unless one is already waiting to run."""
+        from base.services.job_service import JobService
+        recent = timezone.now() - REFRESH_PENDING_WINDOW
+        if Job.objects.filter(name=REFRESH_TASK, status=Job.QUEUED, runAt__gte=recent).exists():
+            return
+        # delayed, so the job is still queued (and picked up above) while a burst of writes lasts
+        JobService.enqueue(REFRESH_TASK, delay=getattr(settings, 'PRODUCT_FACET_REFRESH_DELAY', 10))
+
+    @staticmethod
+    def affects_facets(update_fields) -> bool:
+        return update_fields is None or bool(FACET_FIELDS & set(update_fields))
+
+    # ---- reads ----
+
+    @staticmethod
+    def _filtered(queryset, filters):
+        for field, value in filters.items():
+            if value:
+                queryset = queryset.filter(**{field: FacetService.key(value)})
+        return queryset
+
+    @staticmethod
+    def _counts(queryset, group, filters, count, label=None):
+        queryset = FacetService._filtered(queryset, filters)
+        aggregates = {'count': count}
+        if label:
+            # capitalized spellings sort first
+            aggregates['label'] = Min(label)
+        return list(queryset.order_by().values(group).annotate(**aggregates).order_by('-count', group))
+
+    @staticmethod
+    def facets(q=None, brand=None, category=None, ranges=None) -> dict:
+        """`ranges` are price/rating lookups from ProductRangeFilter.get_lookups()."""
+        ranges = ranges or {}
+        live = bool(q or ranges)
+
+        def source(own=None):
+            if not live:
+                return ProductFacetCount.objects.all()
+            # the price facet ignores the price range, like brand ignores ?brand=
+            qs = Product.objects.filter(**{
+                lookup: value for lookup, value in ranges.items() if lookup.split('__')[0] != own
+            })
+            return ProductSearchService.search(qs, q) if q else qs
+
+        count = Count('id') if live else Sum('count')
+        brands = FacetService._counts(source(), 'brandKey', {'categoryKey': category}, count, 'brand')
+        categories = FacetService._counts(source(), 'categoryKey', {'brandKey': brand}, count, 'category')
+        prices = source('price')
+        if live:
+            prices = prices.annotate(priceBucket=FacetService.bucket_expression())
+        prices = FacetService._counts(prices, 'priceBucket', {'brandKey': brand, 'categoryKey': category}, count)
+
+        price_counts = {row['priceBucket']: row['count'] for row in prices}
+        buckets = [
+            dict(bucket, count=price_counts.get(bucket['bucket'], 0)) for bucket in FacetService.price_buckets()
+        ]
+        if any(lookup.startswith('price__') for lookup in ranges):
+            total = FacetService._filtered(source(), {'brandKey': brand, 'categoryKey': category}).count()
+        else:
+            total = sum(bucket['count'] for bucket in buckets)
+        return {
+            'total': total,
+            'brands': [
+                {'value': row['brandKey'], 'label': (row['label'] or '').strip(), 'count': row['count']}
+                for row in brands if row['brandKey']
+            ],
+            'categories': [
+                {'value': row['categoryKey'], 'label': (row['label'] or '').strip(), 'count': row['count']}
+                for row in categories if row['categoryKey']
+            ],
+            'prices': buckets,
+        }
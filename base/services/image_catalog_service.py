@@ -0,0 +1,90 @@
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".avif"})
+
+# MEDIA_ROOT-relative dir ("" for the root) -> {"mtime": st_mtime_ns, "files": [...], "dirs": [...]}
+_manifest = {}
+_lock = threading.Lock()
+
+
+class ImageCatalogService():
+    """
+    In-memory manifest of the image files under MEDIA_ROOT.
+
+    Each directory is scanned once (os.scandir, no per-file stat) and
+    remembered with its mtime. A lookup only stat()s the directories it
+    covers and rescans the ones whose mtime moved, so listing a folder of
+    hundreds of images costs a single syscall while nothing changed.
+    invalidate() is also called on upload/delete events, for filesystems
+    with coarse mtimes.
+    """
+
+    @staticmethod
+    def root() -> Path:
+        return Path(settings.MEDIA_ROOT).resolve()
+
+    @staticmethod
+    def invalidate(folder=None):
+        with _lock:
+            if folder is None:
+                _manifest.clear()
+            else:
+                _manifest.pop(folder.strip('/'), None)
+
+    @staticmethod
+    def _scan(rel_dir: str, abs_dir: str, mtime: int) -> dict:
+        files, dirs = [], []
+        with os.scandir(abs_dir) as entries:
+            for entry in entries:
+                # symlinked dirs aren't followed: no loops, nothing outside MEDIA_ROOT
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    files.append(entry.name)
+        node = {'mtime': mtime, 'files': sorted(files), 'dirs': sorted(dirs)}
+        _manifest[rel_dir] = node
+        return node
+
+    @staticmethod
+    def _node(rel_dir: str):
+        abs_dir = os.path.join(ImageCatalogService.root(), rel_dir)
+        try:
+            mtime = os.stat(abs_dir).st_mtime_ns
+        except FileNotFoundError:
+            _manifest.pop(rel_dir, None)
+            return None
+        node = _manifest.get(rel_dir)
+        if node is None or node['mtime'] != mtime:
+            node = ImageCatalogService._scan(rel_dir, abs_dir, mtime)
+        return node
+
+    @staticmethod
+    def list_images(folder: str = '', recursive: bool = False, extensions=None) -> list:
+        """
+        MEDIA_ROOT-relative paths of the images in `folder` (and, with
+        `recursive`, every folder below it), sorted by path.
+        `extensions` optionally narrows the result, e.g. {".webp", ".avif"}.
+        """
+        folder = folder.strip('/')
+        wanted = {ext.lower() if ext.startswith('.') else f'.{ext.lower()}' for ext in extensions or ()}
+
+        results = []
+        with _lock:
+            pending = [folder]
+            while pending:
+                rel_dir = pending.pop()
+                node = ImageCatalogService._node(rel_dir)
+                if node is None:
+                    continue
+                prefix = f'{rel_dir}/' if rel_dir else ''
+                for name in node['files']:
+                    if not wanted or os.path.splitext(name)[1].lower() in wanted:
+                        results.append(prefix + name)
+                if recursive:
+                    pending.extend(prefix + name for name in node['dirs'])
+        results.sort()
+        return results
@@ -0,0 +1,160 @@
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .blob_service import BlobService
+from .media_service import MediaService
+
+# Pillow (~50ms to import) is only imported where images are actually
+# decoded/encoded: the serializers import this module for source_name() and
+# sources(), and those run on every product request.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (320, 640, 1024)
+DEFAULT_FORMATS = ('avif', 'webp')
+
+# Pillow encoder name, MIME type and save() options per output format
+FORMAT_OPTIONS = {
+    'avif': ('AVIF', 'image/avif', {'quality': 60, 'speed': 8}),
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+}
+
+
+class ImageService():
+    """
+    Responsive derivatives for Product.image.
+
+    For every configured width (PRODUCT_IMAGE_WIDTHS, never upscaling) and
+    format (PRODUCT_IMAGE_FORMATS, skipping any this Pillow build can't
+    encode) a resized copy is written next to the uploads under
+    `derivatives/<product id>/` (in default_storage: the source may be a
+    content-addressed blob shared with other products, the derivatives are
+    always per product). Their metadata is stored in
+    Product.imageVariants and turned into srcset strings by the serializer.
+    """
+
+    @staticmethod
+    def widths():
+        return tuple(sorted(getattr(settings, 'PRODUCT_IMAGE_WIDTHS', DEFAULT_WIDTHS)))
+
+    @staticmethod
+    def formats():
+        from PIL import features
+        return tuple(
+            fmt for fmt in getattr(settings, 'PRODUCT_IMAGE_FORMATS', DEFAULT_FORMATS)
+            if fmt in FORMAT_OPTIONS and features.check(fmt)
+        )
+
+    @staticmethod
+    def source_name(product) -> str:
+        # seeded products store "/images/foo.jpg" (the MEDIA_URL path) rather than a storage name
+        name = product.image.name or ''
+        if name.startswith(settings.MEDIA_URL):
+            name = name[len(settings.MEDIA_URL):]
+        return name.lstrip('/')
+
+    @staticmethod
+    def build_derivatives(product) -> list:
+        """
+        (Re)build every derivative of the product's current image and save
+        the metadata on the product. Returns the new variant list; an empty
+        list if the product has no (readable) image.
+        """
+        from PIL import UnidentifiedImageError
+        storage = product.image.storage
+        ImageService.delete_derivatives(product, save=False)
+
+        variants = []
+        name = ImageService.source_name(product)
+        if name and storage.exists(name):
+            try:
+                variants = ImageService._render(storage, name, product.pk)
+            except (UnidentifiedImageError, OSError) as e:
+                logger.warning("Could not build image derivatives for product %s: %s", product.pk, e)
+
+        product.imageVariants = variants
+        # for the image URL, so serializing doesn't have to hash the file (blobs don't need it)
+        product.imageHash = ''
+        if name and not BlobService.is_blob(name):
+            product.imageHash = MediaService.content_hash(name) or ''
+        product.save(update_fields=['imageVariants', 'imageHash', 'updatedAt'])
+        return variants
+
+    @staticmethod
+    def _render(storage, name, product_id) -> list:
+        from PIL import Image, ImageOps
+        widths = ImageService.widths()
+        formats = ImageService.formats()
+        stem = posixpath.splitext(posixpath.basename(name))[0]
+
+        with storage.open(name, 'rb') as f:
+            image = Image.open(f)
+            # JPEG can decode straight to a smaller scale, far cheaper than a full decode + resize
+            image.draft('RGB', (widths[-1], widths[-1]))
+            image = ImageOps.exif_transpose(image)
+            image.load()
+
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+        # every width below the original, plus the original width if it's smaller than the largest
+        targets = [w for w in widths if w < image.width] or [image.width]
+        if image.width < widths[-1] and image.width not in targets:
+            targets.append(image.width)
+
+        variants = []
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize(
+                (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0,
+            )
+            for fmt in formats:
+                encoder, mime, options = FORMAT_OPTIONS[fmt]
+                buffer = BytesIO()
+                resized.save(buffer, encoder, **options)
+                data = buffer.getvalue()
+                path = default_storage.save(f'derivatives/{product_id}/{stem}-{width}w.{fmt}', ContentFile(data))
+                variants.append({
+                    'name': path,
+                    'hash': MediaService.hash_bytes(data),
+                    'width': width,
+                    'height': height,
+                    'format': fmt,
+                    'type': mime,
+                    'size': default_storage.size(path),
+                })
+        return variants
+
+    @staticmethod
+    def delete_derivatives(product, save=True):
+        for variant in product.imageVariants or []:
+            try:
+                default_storage.delete(variant['name'])
+            except (KeyError, OSError):
+                pass
+        product.imageVariants = []
+        if save:
+            product.save(update_fields=['imageVariants', 'updatedAt'])
+
+    @staticmethod
+    def sources(variants, build_url) -> list:
+        """
+        <picture>-ready structure, best format first:
+        [{"type": "image/avif", "srcset": "https://.../a-320w.avif 320w, ..."}, ...]
+
+        `build_url(name, content_hash)` gets each variant's stored hash (None
+        for variants built before hashes were stored).
+        """
+        by_type = {}
+        for variant in sorted(variants or [], key=lambda v: v['width']):
+            url = build_url(variant['name'], variant.get('hash'))
+            by_type.setdefault(variant['type'], []).append(f"{url} {variant['width']}w")
+        return [
+            {'type': mime, 'srcset': ', '.join(by_type[mime])}
+            for _, mime, _ in FORMAT_OPTIONS.values() if mime in by_type
+        ]
@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from base.models import Job
+
+logger = logging.getLogger(__name__)
+
+# task name -> (function(payload), on_give_up(payload, error) or None)
+_registry = {}
+
+_executor = None
+_executor_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def task(name, on_give_up=None):
+    """
+    Register a function as a background task:
+
+        @task('build_image_derivatives')
+        def build_image_derivatives(payload): ...
+
+    Raising from the function schedules a retry (with backoff) until
+    JOB_MAX_ATTEMPTS is reached; then `on_give_up(payload, error)` runs.
+    """
+    def decorator(func):
+        _registry[name] = (func, on_give_up)
+        return func
+    return decorator
+
+
+class JobService():
+    """
+    A small database-backed job queue (the base_job table).
+
+    Jobs are claimed with a conditional UPDATE (status queued -> running),
+    so several worker threads/processes can poll the same table safely.
+    JOB_QUEUE_MODE decides who runs them:
+      - "worker": only `manage.py run_jobs` processes
+      - "thread": also an in-process thread pool, right after commit;
+                  delayed jobs and retries on a timer, and every pool run
+                  first sweeps for due / stale jobs (at most every
+                  JOB_SWEEP_INTERVAL seconds), so nothing is stranded when
+                  no worker runs (e.g. on Vercel)
+      - "sync":   inline after commit (tests, debugging); delayed jobs
+                  and retries still need `run_jobs`
+    """
+
+    @staticmethod
+    def _setting(name, default):
+        return getattr(settings, name, default)
+
+    @staticmethod
+    def enqueue(name, payload=None, delay=0) -> Job:
+        if name not in _registry:
+            raise KeyError(f"Unknown task '{name}'")
+        job = Job.objects.create(
+            name=name,
+            payload=payload or {},
+            maxAttempts=JobService._setting('JOB_MAX_ATTEMPTS', 3),
+            runAt=timezone.now() + timedelta(seconds=delay),
+        )
+
+        transaction.on_commit(lambda: JobService._dispatch(job.id, delay))
+        return job
+
+    @staticmethod
+    def _dispatch(job_id, delay=0):
+        """Hand a queued job to the in-process runner, if JOB_QUEUE_MODE has one."""
+        mode = JobService._setting('JOB_QUEUE_MODE', 'thread')
+        if mode == 'sync' and not delay:
+            JobService.run_job_id(job_id)
+        elif mode == 'thread':
+            if not delay:
+                JobService._pool().submit(JobService._run_in_thread, job_id)
+                return
+            # a timer lost with the process is caught by the next sweep (or run_jobs)
+            timer = threading.Timer(delay, JobService._dispatch, args=(job_id,))
+            timer.daemon = True
+            timer.start()
+
+    @staticmethod
+    def _pool():
+        global _executor
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=JobService._setting('JOB_THREADS', 2), thread_name_prefix='jobs',
+                )
+            return _executor
+
+    @staticmethod
+    def _run_in_thread(job_id):
+        # threads get their own DB connection; don't leak it
+        close_old_connections()
+        try:
+            JobService._sweep()
+            if JobService._claim_ids([job_id]):
+                JobService._run_in_process(Job.objects.get(id=job_id))
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def _run_in_process(job):
+        if JobService.run(job):
+            return
+        # no worker may be around for the retry; set its timer here
+        run_at = Job.objects.filter(id=job.id, status=Job.QUEUED).values_list('runAt', flat=True).first()
+        if run_at is not None:
+            JobService._dispatch(job.id, delay=max((run_at - timezone.now()).total_seconds(), 0))
+
+    @staticmethod
+    def _sweep():
+        """Run what is due but has no timer in this process (stale, or queued by another one)."""
+        global _last_sweep
+        with _executor_lock:
+            if time.monotonic() - _last_sweep < JobService._setting('JOB_SWEEP_INTERVAL', 30):
+                return
+            _last_sweep = time.monotonic()
+        JobService.requeue_stale()
+        for job in JobService.claim(JobService._setting('JOB_THREADS', 2)):
+            JobService._run_in_process(job)
+
+    @staticmethod
+    def _claim_ids(ids) -> list:
+        now = timezone.now()
+        claimed = []
+        for job_id in ids:
+            updated = Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+                status=Job.RUNNING, attempts=F('attempts') + 1, startedAt=now, updatedAt=now,
+            )
+            if updated:
+                claimed.append(job_id)
+        return claimed
+
+    @staticmethod
+    def claim(limit: int) -> list:
+        """Claim up to `limit` due jobs for this worker."""
+        due = list(
+            Job.objects.filter(status=Job.QUEUED, runAt__lte=timezone.now())
+            .order_by('runAt', 'id').values_list('id', flat=True)[:limit]
+        )
+        claimed = JobService._claim_ids(due)
+        return list(Job.objects.filter(id__in=claimed).order_by('runAt', 'id'))
+
+    @staticmethod
+    def run_job_id(job_id):
+        if JobService._claim_ids([job_id]):
+            JobService.run(Job.objects.get(id=job_id))
+
+    @staticmethod
+    def run(job):
+        """Run a claimed job and record the outcome (done / retry / failed)."""
+        func, on_give_up = _registry.get(job.name, (None, None))
+        try:
+            if func is None:
+                raise KeyError(f"Unknown task '{job.name}'")
+            func(job.payload)
+        except Exception as e:
+            error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+            logger.warning("Job %s (%s) attempt %s failed: %s", job.id, job.name, job.attempts, error)
+            if job.attempts < job.maxAttempts:
+                backoff = JobService._setting('JOB_RETRY_BACKOFF', 5) * 2 ** (job.attempts - 1)
+                Job.objects.filter(id=job.id).update(
+                    status=Job.QUEUED, lastError=error,
+                    runAt=timezone.now() + timedelta(seconds=backoff), updatedAt=timezone.now(),
+                )
+            else:
+                Job.objects.filter(id=job.id).update(status=Job.FAILED, lastError=error, updatedAt=timezone.now())
+                if on_give_up is not None:
+                    on_give_up(job.payload, error)
+            return False
+
+        Job.objects.filter(id=job.id).update(status=Job.DONE, lastError='', updatedAt=timezone.now())
+        return True
+
+    @staticmethod
+    def requeue_stale():
+        """Put back jobs whose worker died mid-run (running for longer than JOB_LOCK_TIMEOUT)."""
+        cutoff = timezone.now() - timedelta(seconds=JobService._setting('JOB_LOCK_TIMEOUT', 600))
+        return Job.objects.filter(status=Job.RUNNING, startedAt__lt=cutoff).update(
+            status=Job.QUEUED, updatedAt=timezone.now(),
+        )
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import re
+import threading
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+
+from base.services.blob_service import BlobService
+
+HASH_LENGTH = 12
+# "airpods.3f2a9c1b0d4e.jpg" -> ("airpods", "3f2a9c1b0d4e", ".jpg")
+HASHED_NAME_RE = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % HASH_LENGTH)
+
+# MEDIA_ROOT-relative name -> (mtime_ns, size, content hash)
+_hashes = {}
+_lock = threading.Lock()
+
+
+class MediaService():
+    """
+    Content-hashed media URLs.
+
+    `url("airpods.jpg", hash)` returns `/images/airpods.<hash>.jpg`, where
+    the hash is taken from the file's bytes once, when the file is
+    processed, and stored with the product (Product.imageHash, the "hash"
+    of each imageVariants entry). Blob names are content-addressed already
+    and are used as they are. Because the URL changes whenever the file
+    does, media_views.serve_media can answer these URLs with a one-year
+    immutable Cache-Control.
+    """
+
+    @staticmethod
+    def path(name: str) -> str:
+        """Absolute path of a MEDIA_ROOT-relative name; raises SuspiciousFileOperation outside it."""
+        return safe_join(settings.MEDIA_ROOT, name)
+
+    @staticmethod
+    def content_hash(name: str):
+        try:
+            path = MediaService.path(name)
+            stat = os.stat(path)
+        except (OSError, SuspiciousFileOperation):
+            return None
+
+        with _lock:
+            cached = _hashes.get(name)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = hashlib.md5(usedforsecurity=False)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()[:HASH_LENGTH]
+        with _lock:
+            _hashes[name] = (stat.st_mtime_ns, stat.st_size, content_hash)
+        return content_hash
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        """content_hash() of a file with these bytes."""
+        return hashlib.md5(data, usedforsecurity=False).hexdigest()[:HASH_LENGTH]
+
+    @staticmethod
+    def hashed_name(name: str, content_hash=None) -> str:
+        if not content_hash or BlobService.is_blob(name):
+            return name
+        stem, ext = os.path.splitext(name)
+        return f'{stem}.{content_hash}{ext}'
+
+    @staticmethod
+    def url(name: str, content_hash=None) -> str:
+        # no filesystem access: this runs for every image of every serialized product
+        return settings.MEDIA_URL + MediaService.hashed_name(name.lstrip('/'), content_hash)
+
+    @staticmethod
+    def resolve(requested: str):
+        """
+        Map a requested path to (name, requested_hash). Plain names win, so a
+        file that merely looks hashed is still served as itself. Returns
+        None if nothing matches.
+        """
+        requested = requested.lstrip('/')
+        try:
+            if os.path.isfile(MediaService.path(requested)):
+                return requested, None
+        except SuspiciousFileOperation:
+            return None
+
+        match = HASHED_NAME_RE.match(requested)
+        if match is None:
+            return None
+        name = match['stem'] + match['ext']
+        try:
+            if os.path.isfile(MediaService.path(name)):
+                return name, match['hash']
+        except SuspiciousFileOperation:
+            pass
+        return None
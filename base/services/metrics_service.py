@@ -0,0 +1,89 @@
+import threading
+from bisect import bisect_left
+
+# Upper bounds of the histogram buckets (Prometheus "le" labels)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+# anything else is labelled "other", so clients can't mint new series
+METHODS = frozenset(('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'))
+
+
+class Histogram():
+    """Cumulative-bucket histogram in the Prometheus style, one per label set."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield bound, running
+
+
+class MetricsService():
+    """
+    In-process request metrics, fed by base.middleware.RequestMetricsMiddleware.
+
+    Numbers are per worker process and reset on restart - good enough to spot
+    slow or query-heavy routes, not a replacement for a metrics backend.
+    """
+
+    _lock = threading.Lock()
+    _metrics = {
+        'http_request_duration_seconds': ('Request latency by route.', LATENCY_BUCKETS, {}),
+        'http_request_db_queries': ('SQL queries per request by route.', QUERY_COUNT_BUCKETS, {}),
+        'http_request_db_duration_seconds': ('SQL time per request by route.', LATENCY_BUCKETS, {}),
+    }
+
+    @staticmethod
+    def record(route: str, method: str, duration: float, query_count: int, query_time: float):
+        labels = (route, method if method in METHODS else 'other')
+        values = {
+            'http_request_duration_seconds': duration,
+            'http_request_db_queries': query_count,
+            'http_request_db_duration_seconds': query_time,
+        }
+        with MetricsService._lock:
+            for name, value in values.items():
+                _, buckets, series = MetricsService._metrics[name]
+                if labels not in series:
+                    series[labels] = Histogram(buckets)
+                series[labels].observe(value)
+
+    @staticmethod
+    def reset():
+        with MetricsService._lock:
+            for _, _, series in MetricsService._metrics.values():
+                series.clear()
+
+    @staticmethod
+    def _label_value(value: str) -> str:
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    @staticmethod
+    def render_prometheus() -> str:
+        """Text exposition format 0.0.4."""
+        lines = []
+        with MetricsService._lock:
+            for name, (help_text, _, series) in MetricsService._metrics.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (route, method), histogram in sorted(series.items()):
+                    labels = f'route="{MetricsService._label_value(route)}",method="{method}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.total}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.total}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,129 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Prefetch, Sum, Value
+from django.db.models.functions import Coalesce
+from rest_framework import serializers
+
+from base.models import Order, OrderItem, Product, ShippingAddress
+from base.serializers import OrderSerializer, OrderItemCreateSerializer, ShippingSerializer
+from base.services.stock_service import StockService
+
+
+class OrderService():
+
+    @staticmethod
+    def validate_payload(user, payload) -> dict:
+        """
+        Validate the whole checkout payload before anything is written.
+        Raises serializers.ValidationError with every problem found, keyed
+        like the request body (orderItems errors are per line).
+        """
+        errors = {}
+
+        order_data = {
+            'user': user.id,
+            'paymentMethod': payload.get('paymentMethod'),
+            'taxPrice': payload.get('taxPrice'),
+            'shippingPrice': payload.get('shippingPrice'),
+            'totalPrice': payload.get('totalPrice'),
+        }
+        order_serializer = OrderSerializer(data=order_data)
+        if not order_serializer.is_valid():
+            errors.update(order_serializer.errors)
+
+        items_payload = payload.get('orderItems') or []
+        items_serializer = OrderItemCreateSerializer(data=items_payload, many=True)
+        if not items_payload:
+            errors['orderItems'] = ['At least one order item is required.']
+        elif not items_serializer.is_valid():
+            errors['orderItems'] = items_serializer.errors
+
+        shipping_payload = payload.get('shippingAddress') or {}
+        shipping_serializer = None
+        if not isinstance(shipping_payload, dict):
+            # same message DRF gives a nested serializer
+            errors['shippingAddress'] = {'non_field_errors': [
+                f'Invalid data. Expected a dictionary, but got {type(shipping_payload).__name__}.'
+            ]}
+        else:
+            shipping_payload = dict(shipping_payload)
+            shipping_payload.pop('order', None)
+            shipping_payload['shippingPrice'] = payload.get('shippingPrice')
+            shipping_serializer = ShippingSerializer(data=shipping_payload)
+            if not shipping_serializer.is_valid():
+                errors['shippingAddress'] = shipping_serializer.errors
+
+        items = items_serializer.validated_data if 'orderItems' not in errors else []
+        if items:
+            # one query for every product in the cart
+            product_ids = {item['product_id'] for item in items}
+            found = set(Product.objects.filter(id__in=product_ids).values_list('id', flat=True))
+            missing = product_ids - found
+            if missing:
+                errors['orderItems'] = [
+                    {'product': [f'Invalid pk "{item["product_id"]}" - object does not exist.']}
+                    if item['product_id'] in missing else {}
+                    for item in items
+                ]
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return {
+            'order': order_serializer.validated_data,
+            'items': items,
+            'shipping': shipping_serializer.validated_data,
+        }
+
+    @staticmethod
+    def create_order(user, payload) -> Order:
+        """
+        Create an Order with its items and shipping address in one
+        transaction and a fixed number of queries, whatever the cart size
+        (plus one stock UPDATE per distinct product).
+
+        Raises serializers.ValidationError for a bad payload and
+        stock_service.InsufficientStock if the cart can't be filled; nothing
+        is written in either case.
+        """
+        data = OrderService.validate_payload(user, payload)
+
+        with transaction.atomic():
+            StockService.reserve((item['product_id'], item['qty']) for item in data['items'])
+            order = Order.objects.create(**data['order'])
+            OrderItem.objects.bulk_create([OrderItem(order=order, **item) for item in data['items']])
+            ShippingAddress.objects.create(order=order, **data['shipping'])
+
+        return order
+
+    @staticmethod
+    def load_order_aggregate(pk) -> Order:
+        """
+        Order + shipping address (joined) + items (one prefetch query):
+        two queries however many items the order has.
+        Raises Order.DoesNotExist.
+        """
+        return (
+            Order.objects
+            .select_related('shippingaddress')
+            .prefetch_related(Prefetch('orderitem_set', queryset=OrderItem.objects.order_by('_id')))
+            .get(id=pk)
+        )
+
+    @staticmethod
+    def order_history(user, summary=False):
+        """
+        A customer's orders, newest first, served by order_user_created_idx.
+        With `summary`, each order is annotated in SQL with `item_count`
+        (number of lines) and `items_total` (sum of qty * price).
+        """
+        qs = Order.objects.filter(user=user).order_by('-createdAt', '-id')
+        if summary:
+            money = DecimalField(max_digits=12, decimal_places=2)
+            line_total = ExpressionWrapper(F('orderitem__qty') * F('orderitem__price'), output_field=money)
+            qs = qs.annotate(
+                item_count=Count('orderitem'),
+                items_total=Coalesce(Sum(line_total), Value(Decimal('0')), output_field=money),
+            )
+        return qs
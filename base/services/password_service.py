@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class PasswordService():
+    """
+    Password hashing on a small shared thread pool (PASSWORD_HASH_THREADS).
+
+    The request thread still waits for its hash, but at most N hashes run
+    at once per process, so a burst of logins queues up instead of taking
+    every core away from the rest of the API. The hashers (PBKDF2 via
+    hashlib, scrypt, argon2-cffi) release the GIL while they work.
+    Only the hashing runs on the pool; the database stays on the request
+    thread (and its connection / transaction).
+    """
+
+    @staticmethod
+    def _pool():
+        global _executor
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'PASSWORD_HASH_THREADS', 2), thread_name_prefix='passwords',
+                )
+            return _executor
+
+    @staticmethod
+    def _run(func, *args):
+        return PasswordService._pool().submit(func, *args).result()
+
+    @staticmethod
+    def make_password(raw_password) -> str:
+        return PasswordService._run(hashers.make_password, raw_password)
+
+    @staticmethod
+    def check_password(user, raw_password) -> bool:
+        """
+        Like user.check_password(): on success, re-hashes the password when
+        the preferred hasher or its parameters changed.
+        """
+        is_correct, must_update = PasswordService._run(hashers.verify_password, raw_password, user.password)
+        if is_correct and must_update:
+            user.password = PasswordService.make_password(raw_password)
+            user.save(update_fields=['password'])
+        return is_correct
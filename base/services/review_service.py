@@ -0,0 +1,81 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+
+from base.models import Product, Review
+from base.services.cache_service import ProductCacheService
+
+
+class AlreadyReviewed(Exception):
+    """Raised by ReviewService.create_review(); one review per user and product."""
+
+
+class ReviewService():
+    """
+    Reviews and the denormalized Product.rating / numReviews they feed.
+
+    The aggregates are kept as a running sum (Product.ratingSum) and count,
+    changed with one `UPDATE ... SET numReviews = numReviews + 1, ...` in
+    the same transaction as the review row; nothing is re-averaged. Both
+    sides of each assignment see the row as it was before the UPDATE, so
+    concurrent reviews can't lose each other's increments.
+    """
+
+    @staticmethod
+    def reviews_for(product_id):
+        """Newest first, served by review_product_created_idx."""
+        return Review.objects.filter(product_id=product_id).order_by('-createdAt', '-id')
+
+    @staticmethod
+    def create_review(user, product_id, payload) -> Review:
+        """
+        Raises serializers.ValidationError for a bad payload,
+        Product.DoesNotExist and AlreadyReviewed.
+        """
+        # imported here: signals imports this module at startup and the
+        # serializers (DRF, simplejwt) aren't needed until the first review
+        from base.serializers import ReviewCreateSerializer
+
+        serializer = ReviewCreateSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+        rating = serializer.validated_data['rating']
+
+        try:
+            with transaction.atomic():
+                if not ReviewService._apply(product_id, count=1, rating=rating):
+                    raise Product.DoesNotExist()
+                review = Review.objects.create(
+                    product_id=product_id,
+                    user_id=user.id,
+                    name=user.first_name or user.username,
+                    **serializer.validated_data,
+                )
+        except IntegrityError:
+            # review_product_user_unique
+            raise AlreadyReviewed()
+        return review
+
+    @staticmethod
+    def remove_review(review):
+        """Take a deleted review back out of its product's aggregates."""
+        if review.product_id is not None:
+            ReviewService._apply(review.product_id, count=-1, rating=-review.rating)
+
+    @staticmethod
+    def _apply(product_id, count, rating) -> bool:
+        num_reviews = F('numReviews') + count
+        rating_sum = F('ratingSum') + rating
+        updated = Product.objects.filter(pk=product_id).update(
+            numReviews=num_reviews,
+            ratingSum=rating_sum,
+            rating=Case(
+                When(numReviews__gt=-count, then=rating_sum / num_reviews),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+            updatedAt=timezone.now(),
+        )
+        if updated:
+            # QuerySet.update() skips post_save
+            transaction.on_commit(lambda: ProductCacheService.invalidate(product_id))
+        return bool(updated)
@@ -0,0 +1,196 @@
+import re
+
+from django.db import connections, router
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+from base.models import Product
+
+# Names of the search index tables created by migration 0003.
+SQLITE_FTS_TABLE = 'base_product_fts'
+POSTGRES_SEARCH_TABLE = 'base_product_search'
+
+# Column weights: a hit in the name outranks a hit in the brand, which
+# outranks category, which outranks the (long) description.
+_SQLITE_BM25 = f'bm25({SQLITE_FTS_TABLE}, 10.0, 1.0, 4.0, 2.0)'
+
+# Weighted document for the PostgreSQL index (A = name ... D = description).
+POSTGRES_DOCUMENT_SQL = (
+    "setweight(to_tsvector('simple', COALESCE(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', COALESCE(brand, '')), 'B') || "
+    "setweight(to_tsvector('simple', COALESCE(category, '')), 'C') || "
+    "setweight(to_tsvector('simple', COALESCE(description, '')), 'D')"
+)
+
+# Product fields that make up the indexed document
+SEARCH_FIELDS = {'name', 'description', 'brand', 'category'}
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+# (alias, db name) -> bool, so we only introspect the schema once per database
+_index_available = {}
+
+
+class ProductSearchService():
+    """
+    Full-text search over Product.name/description/brand/category.
+
+    SQLite uses an FTS5 virtual table, PostgreSQL a tsvector table with a
+    GIN index. Any other backend (or a database that hasn't been migrated
+    yet) falls back to the old icontains scan.
+    """
+
+    @staticmethod
+    def _connection():
+        return connections[router.db_for_write(Product)]
+
+    @staticmethod
+    def is_available() -> bool:
+        connection = ProductSearchService._connection()
+        key = (connection.alias, connection.settings_dict.get('NAME'))
+        if key not in _index_available:
+            table = {
+                'sqlite': SQLITE_FTS_TABLE,
+                'postgresql': POSTGRES_SEARCH_TABLE,
+            }.get(connection.vendor)
+            _index_available[key] = bool(table) and table in connection.introspection.table_names()
+        return _index_available[key]
+
+    @staticmethod
+    def reset_availability_cache():
+        _index_available.clear()
+
+    @staticmethod
+    def affects_index(update_fields) -> bool:
+        return update_fields is None or bool(SEARCH_FIELDS & set(update_fields))
+
+    @staticmethod
+    def _terms(q: str) -> list:
+        return _TERM_RE.findall(q or '')
+
+    @staticmethod
+    def search(qs, q: str):
+        """
+        Narrow `qs` to products matching `q` and annotate each row with
+        `search_rank` (higher is better). Every term is matched as a prefix,
+        so "airp" already finds "Airpods" while the user is still typing.
+        A `q` without any terms (e.g. only punctuation) searches for nothing
+        and leaves `qs` as it is.
+        """
+        terms = ProductSearchService._terms(q)
+        if not terms:
+            return qs
+
+        if not ProductSearchService.is_available():
+            return ProductSearchService._fallback_search(qs, q)
+
+        vendor = ProductSearchService._connection().vendor
+        if vendor == 'sqlite':
+            match = ' '.join('"%s"*' % term for term in terms)
+            matched_ids = RawSQL(
+                f'SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s',
+                [match],
+            )
+            rank = RawSQL(
+                f'SELECT -{_SQLITE_BM25} FROM {SQLITE_FTS_TABLE} '
+                f'WHERE {SQLITE_FTS_TABLE} MATCH %s AND rowid = "base_product"."id"',
+                [match],
+            )
+        else:
+            tsquery = ' & '.join('%s:*' % term for term in terms)
+            matched_ids = RawSQL(
+                f"SELECT product_id FROM {POSTGRES_SEARCH_TABLE} "
+                f"WHERE document @@ to_tsquery('simple', %s)",
+                [tsquery],
+            )
+            rank = RawSQL(
+                f"SELECT ts_rank(document, to_tsquery('simple', %s)) FROM {POSTGRES_SEARCH_TABLE} "
+                f'WHERE product_id = "base_product"."id"',
+                [tsquery],
+            )
+
+        return qs.filter(id__in=matched_ids).annotate(search_rank=rank)
+
+    @staticmethod
+    def order_by_rank(qs):
+        """Best matches first; newest first among equally ranked products."""
+        if 'search_rank' not in qs.query.annotations:
+            return qs
+        return qs.order_by(F('search_rank').desc(nulls_last=True), '-createdAt', '-id')
+
+    @staticmethod
+    def _fallback_search(qs, q: str):
+        return qs.filter(
+            Q(name__icontains=q) |
+            Q(description__icontains=q) |
+            Q(brand__icontains=q) |
+            Q(category__icontains=q)
+        )
+
+    @staticmethod
+    def index_products(ids):
+        """(Re)index the given product ids from the current base_product rows."""
+        ids = [int(pk) for pk in ids if pk is not None]
+        if not ids or not ProductSearchService.is_available():
+            return
+
+        connection = ProductSearchService._connection()
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(
+                    f'DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid IN ({placeholders})', ids
+                )
+                cursor.execute(
+                    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description, brand, category) "
+                    f"SELECT id, COALESCE(name, ''), COALESCE(description, ''), "
+                    f"COALESCE(brand, ''), COALESCE(category, '') "
+                    f"FROM base_product WHERE id IN ({placeholders})",
+                    ids,
+                )
+            else:
+                cursor.execute(
+                    f"INSERT INTO {POSTGRES_SEARCH_TABLE}(product_id, document) "
+                    f"SELECT id, {POSTGRES_DOCUMENT_SQL} FROM base_product WHERE id IN ({placeholders}) "
+                    f"ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+                    ids,
+                )
+
+    @staticmethod
+    def index_product(product):
+        ProductSearchService.index_products([product.pk])
+
+    @staticmethod
+    def remove_products(ids):
+        ids = [int(pk) for pk in ids if pk is not None]
+        if not ids or not ProductSearchService.is_available():
+            return
+
+        connection = ProductSearchService._connection()
+        placeholders = ', '.join(['%s'] * len(ids))
+        column = 'rowid' if connection.vendor == 'sqlite' else 'product_id'
+        table = SQLITE_FTS_TABLE if connection.vendor == 'sqlite' else POSTGRES_SEARCH_TABLE
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({placeholders})', ids)
+
+    @staticmethod
+    def rebuild():
+        """Drop every index entry and re-index the whole catalog."""
+        if not ProductSearchService.is_available():
+            return
+        connection = ProductSearchService._connection()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'DELETE FROM {SQLITE_FTS_TABLE}')
+                cursor.execute(
+                    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description, brand, category) "
+                    f"SELECT id, COALESCE(name, ''), COALESCE(description, ''), "
+                    f"COALESCE(brand, ''), COALESCE(category, '') FROM base_product"
+                )
+            else:
+                cursor.execute(f'TRUNCATE {POSTGRES_SEARCH_TABLE}')
+                cursor.execute(
+                    f"INSERT INTO {POSTGRES_SEARCH_TABLE}(product_id, document) "
+                    f"SELECT id, {POSTGRES_DOCUMENT_SQL} FROM base_product"
+                )
+
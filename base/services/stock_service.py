@@ -0,0 +1,93 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from base.models import Product
+from base.services.cache_service import ProductCacheService
+
+
+class InsufficientStock(Exception):
+    """Raised by StockService.reserve(); `shortages` lists every line that can't be filled."""
+
+    def __init__(self, shortages):
+        super().__init__('Insufficient stock.')
+        self.shortages = shortages
+
+
+class StockService():
+
+    @staticmethod
+    def _quantities(lines) -> dict:
+        # merge duplicate cart lines for the same product
+        quantities = defaultdict(int)
+        for product_id, qty in lines:
+            quantities[int(product_id)] += int(qty)
+        return quantities
+
+    @staticmethod
+    def reserve(lines):
+        """
+        Decrement stock for `lines` ((product_id, qty) pairs) all-or-nothing.
+
+        Each product is decremented with a conditional
+        `UPDATE ... SET countInStock = countInStock - qty WHERE countInStock >= qty`,
+        so concurrent checkouts can never oversell and nothing is read first.
+        Rows are updated in ascending id order: two carts sharing products
+        always lock them in the same order and can't deadlock each other.
+
+        Raises InsufficientStock (and rolls back every decrement) if any
+        product is short.
+        """
+        quantities = StockService._quantities(lines)
+        now = timezone.now()
+
+        with transaction.atomic():
+            short_ids = []
+            for product_id in sorted(quantities):
+                qty = quantities[product_id]
+                updated = Product.objects.filter(pk=product_id, countInStock__gte=qty).update(
+                    countInStock=F('countInStock') - qty, updatedAt=now,
+                )
+                if not updated:
+                    short_ids.append(product_id)
+
+            if short_ids:
+                available = dict(
+                    Product.objects.filter(pk__in=short_ids).values_list('id', 'countInStock')
+                )
+                raise InsufficientStock([
+                    {
+                        'product': product_id,
+                        'requested': quantities[product_id],
+                        'available': available.get(product_id, 0),
+                    }
+                    for product_id in short_ids
+                ])
+
+            StockService._invalidate_on_commit(quantities)
+
+    @staticmethod
+    def adjust(product_id, delta: int) -> bool:
+        """
+        Atomically add `delta` (may be negative) to a product's stock.
+        Returns False if that would take the stock below zero.
+        """
+        qs = Product.objects.filter(pk=product_id)
+        if delta < 0:
+            qs = qs.filter(countInStock__gte=-delta)
+        updated = qs.update(countInStock=F('countInStock') + delta, updatedAt=timezone.now())
+        if updated:
+            StockService._invalidate_on_commit([product_id])
+        return bool(updated)
+
+    @staticmethod
+    def _invalidate_on_commit(product_ids):
+        # QuerySet.update() doesn't send post_save, so do the cache part of it here
+        product_ids = list(product_ids)
+
+        def invalidate():
+            for product_id in product_ids:
+                ProductCacheService.invalidate(product_id)
+        transaction.on_commit(invalidate)
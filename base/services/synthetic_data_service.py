@@ -0,0 +1,101 @@
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from base.models import Order, OrderItem, Product, ShippingAddress
+from base.services.facet_service import FacetService
+from base.services.search_service import ProductSearchService
+
+BRANDS = ['Apple', 'Samsung', 'Sony', 'Logitech', 'Dell', 'Razer', 'Amazon', 'Google', 'Xiaomi', 'Asus']
+CATEGORIES = ['Electronics', 'Phones', 'Laptops', 'Audio', 'Gaming', 'Accessories', 'Cameras', 'Smart Home']
+NOUNS = ['Headphones', 'Phone', 'Laptop', 'Mouse', 'Keyboard', 'Camera', 'Speaker', 'Monitor', 'Tablet', 'Console']
+ADJECTIVES = ['Wireless', 'Pro', 'Ultra', 'Mini', 'Max', 'Gaming', 'Portable', 'Smart', 'Compact', 'Studio']
+WORDS = ['fast', 'battery', 'bluetooth', 'display', 'quality', 'sound', 'design', 'light', 'premium', 'noise',
+         'cancelling', 'charging', 'memory', 'storage', 'camera', 'performance', 'ergonomic', 'durable']
+
+
+class SyntheticDataService():
+    """
+    Reproducible fake catalogs and order histories for benchmarks
+    (see the bench_api management command). Everything is bulk inserted in
+    fixed-size batches, so a 1M product catalog doesn't need 1M INSERTs.
+    """
+
+    @staticmethod
+    def generate_catalog(count: int, batch_size: int = 5000, seed: int = 0) -> int:
+        rng = random.Random(seed)
+        created = 0
+        while created < count:
+            size = min(batch_size, count - created)
+            batch = []
+            for i in range(created, created + size):
+                brand = rng.choice(BRANDS)
+                rating = round(rng.uniform(1, 5), 1)
+                num_reviews = rng.randint(0, 2000)
+                batch.append(Product(
+                    name=f'{brand} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}',
+                    description=' '.join(rng.choices(WORDS, k=rng.randint(8, 40))),
+                    brand=brand,
+                    category=rng.choice(CATEGORIES),
+                    price=round(rng.uniform(5, 3000), 2),
+                    countInStock=rng.randint(0, 500),
+                    rating=rating,
+                    numReviews=num_reviews,
+                    ratingSum=rating * num_reviews,
+                ))
+            with transaction.atomic():
+                Product.objects.bulk_create(batch)
+            created += size
+
+        # bulk_create skips the post_save receivers
+        ProductSearchService.rebuild()
+        FacetService.refresh()
+        return created
+
+    @staticmethod
+    def generate_users(count: int, password: str = 'bench-password', prefix: str = 'bench') -> list:
+        # hash once: every synthetic user shares the same password
+        hashed = make_password(password)
+        users = [
+            User(username=f'{prefix}{i}@example.com', email=f'{prefix}{i}@example.com',
+                 first_name=f'{prefix} {i}', password=hashed)
+            for i in range(count)
+        ]
+        return User.objects.bulk_create(users)
+
+    @staticmethod
+    def generate_orders(users, orders_per_user: int, max_items: int = 5,
+                        batch_size: int = 2000, seed: int = 0) -> int:
+        rng = random.Random(seed)
+        product_ids = list(Product.objects.values_list('id', flat=True)[:10000])
+        if not product_ids:
+            return 0
+
+        pending = [user for user in users for _ in range(orders_per_user)]
+        created = 0
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            with transaction.atomic():
+                orders = Order.objects.bulk_create([
+                    Order(user=user, paymentMethod='PayPal', taxPrice=Decimal('1.00'),
+                          shippingPrice=Decimal('5.00'), totalPrice=Decimal('0'))
+                    for user in chunk
+                ])
+                items = []
+                for order in orders:
+                    for _ in range(rng.randint(1, max_items)):
+                        items.append(OrderItem(
+                            order=order, product_id=rng.choice(product_ids), name='item',
+                            qty=rng.randint(1, 3), price=Decimal(rng.randint(5, 900)),
+                        ))
+                OrderItem.objects.bulk_create(items)
+                ShippingAddress.objects.bulk_create([
+                    ShippingAddress(order=order, address='1 Bench St', city='Hanoi',
+                                    postalCode='10000', country='VN', shippingPrice=Decimal('5.00'))
+                    for order in orders
+                ])
+            created += len(orders)
+        return created
@@ -0,0 +1,114 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from base.services.user_cache_service import UserCacheService
+from base.streaming import csv_lines
+
+# ?ordering= values accepted by the user list (anything else is ignored)
+ORDERINGS = ('id', '-id', 'date_joined', '-date_joined', 'email', '-email', 'username', '-username')
+# fields a bulk update may set, in one UPDATE
+BULK_FIELDS = ('is_staff', 'is_active')
+MAX_BULK_IDS = 1000
+
+EXPORT_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name', 'is_staff', 'is_active',
+                 'date_joined', 'last_login')
+
+
+def _text(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+class BulkUserSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_BULK_IDS,
+    )
+    is_staff = serializers.BooleanField(required=False)
+    is_active = serializers.BooleanField(required=False)
+
+
+class UserAdminService():
+    """Admin-side user listing, bulk updates/deletes and exports."""
+
+    @staticmethod
+    def _flag(value):
+        if value is None or value == '':
+            return None
+        return value.lower() in ('1', 'true', 'yes')
+
+    @staticmethod
+    def filter_users(params):
+        """
+        ?q= (username / email / name contains), ?is_staff=, ?is_active=,
+        ?ordering= (one of ORDERINGS, default newest first).
+        """
+        qs = User.objects.all()
+        q = (params.get('q') or '').strip()
+        if q:
+            qs = qs.filter(
+                Q(username__icontains=q) | Q(email__icontains=q) |
+                Q(first_name__icontains=q) | Q(last_name__icontains=q)
+            )
+        for flag in ('is_staff', 'is_active'):
+            value = UserAdminService._flag(params.get(flag))
+            if value is not None:
+                qs = qs.filter(**{flag: value})
+        ordering = params.get('ordering')
+        if ordering in ORDERINGS:
+            return qs.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+        return qs.order_by('-date_joined', '-id')
+
+    @staticmethod
+    def validate_bulk(data, acting_user, delete=False) -> dict:
+        """
+        {"ids": [...], "is_staff": bool, "is_active": bool} -> {"ids", "fields"}.
+        Raises serializers.ValidationError.
+        """
+        serializer = BulkUserSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        fields = dict(serializer.validated_data)
+        ids = sorted(set(fields.pop('ids')))
+        if not delete and not fields:
+            raise serializers.ValidationError({'detail': f"Nothing to update; send any of {', '.join(BULK_FIELDS)}."})
+        # an admin locking themselves out is never what the batch meant
+        locks_out = delete or fields.get('is_staff') is False or fields.get('is_active') is False
+        if locks_out and acting_user.id in ids:
+            raise serializers.ValidationError({'ids': ['You cannot demote, deactivate or delete your own account.']})
+        return {'ids': ids, 'fields': fields}
+
+    @staticmethod
+    def bulk_update(ids, fields) -> int:
+        """One UPDATE for every selected user. Returns the number of rows changed."""
+        updated = User.objects.filter(id__in=ids).update(**fields)
+        # .update() skips post_save, so drop this process's cached rows here
+        for user_id in ids:
+            UserCacheService.invalidate(user_id)
+        return updated
+
+    @staticmethod
+    def bulk_delete(ids) -> int:
+        """
+        Delete the selected users in one transaction: one DELETE for the
+        users plus one statement per related table (orders and products
+        keep their rows with user set to NULL). Returns the users deleted.
+        """
+        with transaction.atomic():
+            _, per_model = User.objects.filter(id__in=ids).delete()
+        return per_model.get(User._meta.label, 0)
+
+    @staticmethod
+    def export_rows(qs, fmt, chunk_size=2000):
+        """
+        Lazily yield the users as CSV lines (with a header) or NDJSON lines.
+        Rows are fetched chunk_size at a time (a server-side cursor on
+        PostgreSQL), so memory stays flat however many users there are.
+        """
+        rows = qs.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+        if fmt == 'csv':
+            yield from csv_lines(EXPORT_FIELDS, ([_text(value) for value in row] for row in rows))
+        else:
+            for row in rows:
+                yield json.dumps(dict(zip(EXPORT_FIELDS, map(_text, row)))) + '\n'
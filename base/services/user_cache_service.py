@@ -0,0 +1,63 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+# user id -> (expires at, User); bounded, oldest entry dropped first
+_users = {}
+_lock = threading.Lock()
+MAX_ENTRIES = 1024
+
+
+class UserCacheService():
+    """
+    Short-lived, per-process cache of User rows for requests authenticated
+    from JWT claims (base/authentication.py) that still need the full model.
+
+    Entries live USER_CACHE_TTL seconds. The User post_save/post_delete
+    receivers drop the entry in this process; other processes catch up
+    when it expires. Never save() a cached instance: it is shared between
+    threads. Writes go through model(user, cached=False).
+    """
+
+    @staticmethod
+    def _ttl() -> float:
+        return getattr(settings, 'USER_CACHE_TTL', 30)
+
+    @staticmethod
+    def get(user_id):
+        """The User with this id (None if it doesn't exist), from cache when fresh."""
+        now = time.monotonic()
+        entry = _users.get(user_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        user = User.objects.filter(pk=user_id).first()
+        ttl = UserCacheService._ttl()
+        if user is not None and ttl > 0:
+            with _lock:
+                if len(_users) >= MAX_ENTRIES:
+                    _users.pop(next(iter(_users)), None)
+                _users[user_id] = (now + ttl, user)
+        return user
+
+    @staticmethod
+    def model(user, cached=True):
+        """
+        A real User instance for `request.user`, which may be a claims-only
+        user. Pass cached=False when the instance is going to be modified.
+        """
+        if isinstance(user, User):
+            return user
+        if not cached:
+            return User.objects.filter(pk=user.id).first()
+        return UserCacheService.get(user.id)
+
+    @staticmethod
+    def invalidate(user_id=None):
+        with _lock:
+            if user_id is None:
+                _users.clear()
+            else:
+                _users.pop(user_id, None)
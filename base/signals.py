@@ -1,12 +1,25 @@
 import json
-from decimal import Decimal
+import logging
 from pathlib import Path
 
+from django.contrib.auth.models import User
 from django.db import transaction
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, pre_save, post_save, post_delete
 from django.dispatch import receiver
 
-from .models import Product
+from .models import Product, Review
+from .services.search_service import ProductSearchService
+from .services.cache_service import ProductCacheService
+from .services.image_catalog_service import ImageCatalogService
+from .services.blob_service import BlobService
+from .services.user_cache_service import UserCacheService
+from .services.review_service import ReviewService
+from .services.facet_service import FacetService
+from .services.catalog_service import CatalogService
+from .services.image_service import ImageService
+from .services.media_service import MediaService
+
+logger = logging.getLogger(__name__)
 
 
 def _data_file() -> Path:
@@ -16,13 +29,86 @@ def _data_file() -> Path:
 @receiver(post_migrate)
 def insert_initial_data(sender, **kwargs):
     """Insert initial data after migration is complete."""
-    seed_products_if_empty()
+    # the search index tables may have just been created
+    ProductSearchService.reset_availability_cache()
+    # post_migrate fires once per installed app; seed and count once per migrate
+    if getattr(sender, 'label', None) == 'base':
+        seed_products_if_empty()
+        # the facet table may be new (or behind a bulk import)
+        FacetService.refresh()
+
+@receiver(post_save, sender=Product)
+def index_product_for_search(sender, instance, update_fields=None, **kwargs):
+    """Keep the full-text search index in sync with product writes."""
+    # stock, image status / variant saves leave the indexed text alone
+    if ProductSearchService.affects_index(update_fields):
+        ProductSearchService.index_product(instance)
+
+@receiver(post_delete, sender=Product)
+def remove_product_from_search(sender, instance, **kwargs):
+    ProductSearchService.remove_products([instance.pk])
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    """Drop cached anonymous list/detail responses so writes show up immediately."""
+    # after commit, so a concurrent reader can't re-cache the pre-write rows
+    pk = instance.pk
+    transaction.on_commit(lambda: ProductCacheService.invalidate(pk))
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def refresh_product_facets(sender, instance, update_fields=None, **kwargs):
+    """Stock, rating and image saves leave the brand/category/price counts alone."""
+    if FacetService.affects_facets(update_fields):
+        FacetService.schedule_refresh()
+
+@receiver(pre_save, sender=Product)
+def remember_previous_image(sender, instance, update_fields=None, **kwargs):
+    # saves that can't touch `image` skip the extra query
+    instance._image_tracked = update_fields is None or 'image' in update_fields
+    instance._previous_image = None
+    if instance._image_tracked and instance.pk is not None:
+        instance._previous_image = Product.objects.filter(pk=instance.pk).values_list('image', flat=True).first()
+
+@receiver(post_save, sender=Product)
+def count_image_references(sender, instance, **kwargs):
+    """Keep MediaBlob.refCount in step with the products pointing at each blob."""
+    if not getattr(instance, '_image_tracked', False):
+        return
+    current = instance.image.name if instance.image else None
+    if current != instance._previous_image:
+        BlobService.acquire(current)
+        BlobService.release(instance._previous_image)
+
+@receiver(post_delete, sender=Product)
+def release_image_reference(sender, instance, **kwargs):
+    BlobService.release(instance.image.name if instance.image else None)
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_image_catalog(sender, instance, update_fields=None, **kwargs):
+    """Uploads go through Product.image; mtimes alone can miss same-second changes."""
+    if update_fields is None or {'image', 'imageVariants'} & set(update_fields):
+        ImageCatalogService.invalidate()
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_rating(sender, instance, **kwargs):
+    """Reviews deleted from the admin leave the product's running rating too."""
+    ReviewService.remove_review(instance)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    UserCacheService.invalidate(instance.pk)
 
 def seed_products_if_empty():
     """
     After migrations, if the Product table is empty,
     load data from products/data/product.json and insert it.
     """
+    if Product.objects.exists():
+        return
 
     data_path = _data_file()
     if not data_path.exists():
@@ -32,28 +118,20 @@ def seed_products_if_empty():
     with data_path.open('r', encoding='utf-8') as f:
         records = json.load(f) or []
 
+    # same field mapping as `manage.py import_products` ("_id" is kept as the pk,
+    # so the frontend routes match)
     to_create = []
-    for rec in records:
-        # Map JSON fields to model fields
-        # Your JSON has "_id" (string). We'll set the PK to that int
-        # so your FE routes match (optional; you can omit if you prefer auto IDs).
+    for i, rec in enumerate(records):
         try:
-            pk = int(rec.get('_id')) if rec.get('_id') is not None else None
-        except (TypeError, ValueError):
-            pk = None
-
-        to_create.append(Product(
-            id=pk,  # optional: let Django autogenerate if you prefer
-            name=rec.get('name', ''),
-            image=rec.get('image', ''),
-            description=rec.get('description', ''),
-            brand=rec.get('brand', ''),
-            category=rec.get('category', ''),
-            price=Decimal(str(rec.get('price', 0))),  # Decimal for money fields
-            countInStock=int(rec.get('countInStock', 0) or 0),
-            rating=float(rec.get('rating', 0) or 0),
-            numReviews=int(rec.get('numReviews', 0) or 0),
-        ))
+            to_create.append(CatalogService.product_from_record(rec))
+        except (ValueError, TypeError) as e:
+            # one bad entry (e.g. a non-numeric "_id") shouldn't stop the rest from loading
+            logger.warning("Skipping product.json entry %s: %s", i, e)
+    for product in to_create:
+        # bundled files; hashed once here instead of on every serialization
+        name = ImageService.source_name(product)
+        if name and not BlobService.is_blob(name):
+            product.imageHash = MediaService.content_hash(name) or ''
 
     if not to_create:
         return
@@ -61,3 +139,7 @@ def seed_products_if_empty():
     # Single transaction; faster + safer
     with transaction.atomic():
         Product.objects.bulk_create(to_create, ignore_conflicts=True)
+        # bulk_create skips post_save, so index the seeded rows in one go
+        ProductSearchService.rebuild()
+        FacetService.refresh()
+    ProductCacheService.invalidate()
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs/'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every file under the SHA-256 of its bytes:
+    `blobs/ab/cd/abcd...ef.jpg`.
+
+    The upload is hashed while it is streamed, chunk by chunk, to a temp
+    file next to the blobs, then moved into place. If the blob already
+    exists, the copy is dropped, so N uploads of the same image take the
+    disk space of one. The file name the client sent is ignored beyond
+    its extension.
+
+    Blobs can be shared by several products; BlobService counts the
+    references and only deletes a blob once nothing points at it.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # the final name is only known once the content is hashed (_save)
+        return name
+
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1].lower()
+        blob_dir = self.path(BLOB_PREFIX.rstrip('/'))
+        os.makedirs(blob_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=blob_dir, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            sha = digest.hexdigest()
+            blob_name = f'{BLOB_PREFIX}{sha[:2]}/{sha[2:4]}/{sha}{ext}'
+            full_path = self.path(blob_name)
+            try:
+                # already stored: keep it, and bump the mtime so a pending
+                # delete_media_files job leaves it alone (delete_unless_touched)
+                os.utime(full_path)
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(tmp_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        return blob_name
+
+    def delete_unless_touched(self, name, since) -> bool:
+        """
+        Delete a blob unless _save() stored the same bytes again after
+        `since` (a Unix timestamp). Returns True if the file was removed.
+
+        The blob is first renamed out of the way, so an upload racing with
+        this either touched it before the rename (and it is put back) or
+        finds it gone and writes a fresh copy.
+        """
+        path = self.path(name)
+        doomed = f'{path}.deleting'
+        try:
+            os.rename(path, doomed)
+        except FileNotFoundError:
+            return False
+        if os.stat(doomed).st_mtime > since:
+            if os.path.exists(path):
+                # an upload already wrote a fresh copy
+                os.unlink(doomed)
+            else:
+                os.replace(doomed, path)
+            return False
+        os.unlink(doomed)
+        return True
+
+
+def product_image_storage():
+    return ContentAddressedStorage()
@@ -0,0 +1,16 @@
+"""Helpers for exports that are streamed line by line (StreamingHttpResponse, management commands)."""
+import csv
+
+
+class Echo():
+    """File-like object for csv.writer that hands each line back instead of storing it."""
+    def write(self, value):
+        return value
+
+
+def csv_lines(header, rows):
+    """Yield the CSV header line, then one line per row; nothing is buffered."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,61 @@
+"""Background tasks run by base.services.job_service (imported from BaseConfig.ready)."""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import MediaBlob, Product
+from .services.blob_service import BlobService
+from .services.cache_service import ProductCacheService
+from .services.facet_service import REFRESH_TASK, FacetService
+from .services.image_catalog_service import ImageCatalogService
+from .services.image_service import ImageService
+from .services.job_service import task
+
+
+def _image_failed(payload, error):
+    product_id = payload['product_id']
+    updated = Product.objects.filter(pk=product_id).update(imageStatus='failed', updatedAt=timezone.now())
+    if updated:
+        # QuerySet.update() skips post_save; pollers read the cached / conditional responses
+        transaction.on_commit(lambda: ProductCacheService.invalidate(product_id))
+
+
+@task('build_image_derivatives', on_give_up=_image_failed)
+def build_image_derivatives(payload):
+    product = Product.objects.filter(pk=payload['product_id']).first()
+    if product is None:
+        return
+    # a newer upload replaced the image this job was queued for; its own job will handle it
+    if payload.get('image') and payload['image'] != product.image.name:
+        return
+
+    product.imageStatus = 'processing'
+    product.save(update_fields=['imageStatus', 'updatedAt'])
+    ImageService.build_derivatives(product)
+    product.imageStatus = 'ready'
+    product.save(update_fields=['imageStatus', 'updatedAt'])
+
+
+@task('delete_media_files')
+def delete_media_files(payload):
+    """Remove replaced uploads / unreferenced blobs once no product points at them any more."""
+    storage = Product._meta.get_field('image').storage
+    for name in payload.get('names', []):
+        if not name or Product.objects.filter(image=name).exists():
+            continue
+        if BlobService.is_blob(name):
+            # deleting the row first stops a concurrent acquire() from reusing it
+            deleted, _ = MediaBlob.objects.filter(name=name, refCount=0).delete()
+            if not deleted:
+                continue
+            if 'since' in payload:
+                # an upload of the same bytes since the release keeps the file;
+                # its product save recreates the row
+                storage.delete_unless_touched(name, payload['since'])
+                continue
+        storage.delete(name)
+    ImageCatalogService.invalidate()
+
+
+@task(REFRESH_TASK)
+def refresh_product_facets(payload):
+    FacetService.refresh()
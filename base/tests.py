@@ -1,3 +1,299 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.client import RequestFactory
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from .management.commands.bench_api import percentile
+from .models import Job, MediaBlob, Order, Product, ShippingAddress
+from .serializers import ProductListSerializer, ProductSerializer
+from .services.order_service import OrderService
+from .services.stock_service import InsufficientStock, StockService
+from .tasks import delete_media_files
+
+
+class ProductListSerializerTests(TestCase):
+    """The list fast path must keep returning exactly what ProductSerializer does."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.create(
+            name='Blob image', image='blobs/ab/cd/abcdef.jpg', brand='Acme', category='Audio',
+            price=19.99, countInStock=3, rating=4.5, numReviews=2,
+            imageVariants=[
+                {'name': 'derivatives/1/abcdef-320w.avif', 'width': 320, 'type': 'image/avif', 'hash': '0123456789ab'},
+                {'name': 'derivatives/1/abcdef-320w.webp', 'width': 320, 'type': 'image/webp'},
+            ],
+            imageStatus='ready',
+        )
+        Product.objects.create(name='Legacy image', image='/images/ünïcode.jpg', imageHash='ba9876543210', price=5)
+        Product.objects.create(name=None, description=None, brand=None, category=None)
+
+    def serialize_both(self, query):
+        request = Request(RequestFactory().get('/api/products/', query))
+        fields = ProductSerializer.sparse_fields(request)
+        qs = Product.objects.order_by('id')
+        if fields:
+            qs = qs.only(*ProductSerializer.columns(fields))
+        context = {'request': request}
+        drf = ProductSerializer(qs, many=True, context=context, fields=fields).data
+        lean = ProductListSerializer(list(qs), context=context, fields=fields).data
+        return [dict(row) for row in drf], lean
+
+    def test_every_field(self):
+        drf, lean = self.serialize_both({})
+        self.assertEqual(len(lean), Product.objects.count())
+        self.assertEqual(lean, drf)
+
+    def test_sparse_fields(self):
+        drf, lean = self.serialize_both({'fields': 'price,_id,image,imageSources,createdAt'})
+        self.assertEqual(list(lean[0]), ['_id', 'image', 'imageSources', 'price', 'createdAt'])
+        self.assertEqual(lean, drf)
+
+    def test_without_request(self):
+        qs = Product.objects.order_by('id')
+        drf = [dict(row) for row in ProductSerializer(qs, many=True).data]
+        self.assertEqual(ProductListSerializer(list(qs)).data, drf)
+
+
+class StockReservationTests(TestCase):
+
+    def setUp(self):
+        self.plenty = Product.objects.create(name='Plenty', price=10, countInStock=10)
+        self.scarce = Product.objects.create(name='Scarce', price=20, countInStock=1)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('buyer', 'buyer@example.com', 'pw'))
+
+    def checkout(self, *lines):
+        return self.client.post('/api/orders/', {
+            'paymentMethod': 'PayPal', 'taxPrice': '0.00', 'shippingPrice': '0.00', 'totalPrice': '30.00',
+            'orderItems': [
+                {'product': product.id, 'name': product.name, 'qty': qty, 'price': str(product.price)}
+                for product, qty in lines
+            ],
+            'shippingAddress': {'address': '1 Main St', 'city': 'Town', 'postalCode': '1000', 'country': 'NL'},
+        }, format='json')
+
+    def assertStock(self, plenty, scarce):
+        self.assertEqual(Product.objects.get(pk=self.plenty.pk).countInStock, plenty)
+        self.assertEqual(Product.objects.get(pk=self.scarce.pk).countInStock, scarce)
+
+    def test_order_reserves_stock(self):
+        response = self.checkout((self.plenty, 2), (self.scarce, 1))
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertStock(8, 0)
+
+    def test_oversell_is_rejected_and_nothing_is_reserved(self):
+        response = self.checkout((self.plenty, 2), (self.scarce, 2))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['shortages'], [{'product': self.scarce.id, 'requested': 2, 'available': 1}])
+        # the plenty line was decremented first and must have been rolled back
+        self.assertStock(10, 1)
+        self.assertFalse(Order.objects.exists())
+
+    def test_shipping_address_must_be_an_object(self):
+        for bad in ('1 Main St', ['1 Main St'], 42):
+            response = self.client.post('/api/orders/', {
+                'totalPrice': '10.00',
+                'orderItems': [{'product': self.plenty.id, 'name': 'Plenty', 'qty': 1, 'price': '10.00'}],
+                'shippingAddress': bad,
+            }, format='json')
+            self.assertEqual(response.status_code, 400, bad)
+            self.assertIn('shippingAddress', response.json())
+        self.assertStock(10, 1)
+
+    def test_duplicate_lines_are_reserved_together(self):
+        response = self.checkout((self.scarce, 1), (self.scarce, 1))
+        self.assertEqual(response.status_code, 409)
+        self.assertStock(10, 1)
+
+    def test_second_reservation_of_the_last_item_fails(self):
+        StockService.reserve([(self.scarce.id, 1)])
+        with self.assertRaises(InsufficientStock):
+            StockService.reserve([(self.scarce.id, 1)])
+        self.assertStock(10, 0)
+
+    def test_stock_is_restored_when_the_order_fails_after_reserving(self):
+        user = User.objects.get(username='buyer')
+        body = {
+            'paymentMethod': 'PayPal', 'totalPrice': '10.00',
+            'orderItems': [{'product': self.plenty.id, 'name': 'Plenty', 'qty': 3, 'price': '10.00'}],
+            'shippingAddress': {'address': '1 Main St', 'city': 'Town', 'postalCode': '1000', 'country': 'NL'},
+        }
+        with mock.patch.object(ShippingAddress.objects, 'create', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                OrderService.create_order(user, body)
+        self.assertStock(10, 1)
+        self.assertFalse(Order.objects.exists())
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        created = Product.objects.create(name='first').createdAt
+        for i in range(6):
+            Product.objects.create(name=f'tie {i}')
+        # rows sharing a createdAt are told apart by id
+        Product.objects.filter(name__startswith='tie').update(createdAt=created)
+        self.expected = list(Product.objects.order_by('-createdAt', '-id').values_list('id', flat=True))
+
+    def page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return [row['_id'] for row in body['results']], body['next'], body['previous']
+
+    def test_cursor_round_trip(self):
+        ids, next_url, previous_url = self.page('/api/products/?pagination=cursor&page_size=3&fields=_id')
+        self.assertIsNone(previous_url)
+        pages = [ids]
+        while next_url:
+            ids, next_url, previous_url = self.page(next_url)
+            pages.append(ids)
+        self.assertEqual([pk for page in pages for pk in page], self.expected)
+
+        # and back again, through the previous links
+        back = [pages[-1]]
+        while previous_url:
+            ids, _, previous_url = self.page(previous_url)
+            back.append(ids)
+        self.assertEqual(back[::-1], pages)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/products/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(JOB_QUEUE_MODE='worker')
+class BlobReferenceTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = Product._meta.get_field('image').storage
+        self.name = self.storage.save('photo.jpg', ContentFile(b'same bytes'))
+
+    def ref_count(self):
+        return MediaBlob.objects.get(name=self.name).refCount
+
+    def release_all(self, *products):
+        with self.captureOnCommitCallbacks(execute=True):
+            for product in products:
+                product.delete()
+        return Job.objects.get(name='delete_media_files')
+
+    def test_identical_uploads_share_one_blob(self):
+        self.assertEqual(self.storage.save('copy.jpg', ContentFile(b'same bytes')), self.name)
+        self.assertTrue(self.name.startswith('blobs/'))
+
+    def test_products_acquire_and_release(self):
+        first = Product.objects.create(name='a', image=self.name)
+        second = Product.objects.create(name='b', image=self.name)
+        self.assertEqual(self.ref_count(), 2)
+
+        second.image = ''
+        second.save()
+        self.assertEqual(self.ref_count(), 1)
+        self.assertFalse(Job.objects.filter(name='delete_media_files').exists())
+
+        job = self.release_all(first)
+        self.assertEqual(self.ref_count(), 0)
+        self.assertEqual(job.payload['names'], [self.name])
+        self.assertGreater(job.runAt, job.createdAt)  # delayed
+
+        delete_media_files(job.payload)
+        self.assertFalse(MediaBlob.objects.filter(name=self.name).exists())
+        self.assertFalse(self.storage.exists(self.name))
+
+    def test_blob_in_use_again_is_kept(self):
+        job = self.release_all(Product.objects.create(name='a', image=self.name))
+        Product.objects.create(name='b', image=self.name)
+        delete_media_files(job.payload)
+        self.assertEqual(self.ref_count(), 1)
+        self.assertTrue(self.storage.exists(self.name))
+
+    def test_reupload_before_the_delete_keeps_the_file(self):
+        job = self.release_all(Product.objects.create(name='a', image=self.name))
+        old = job.payload['since'] - 10
+        os.utime(self.storage.path(self.name), (old, old))
+        # the same bytes come in again; the product row is only saved after the job ran
+        self.assertEqual(self.storage.save('again.jpg', ContentFile(b'same bytes')), self.name)
+        delete_media_files(job.payload)
+        self.assertTrue(self.storage.exists(self.name))
+        Product.objects.create(name='b', image=self.name)
+        self.assertEqual(self.ref_count(), 1)
+
+
+class CatalogImportTests(TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+        self.addCleanup(os.unlink, self.path)
+
+    def write(self, records):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+
+    def run_import(self):
+        call_command('import_products', self.path, stdout=StringIO(), stderr=StringIO())
+
+    def catalog(self):
+        return list(Product.objects.filter(id__gte=9001).order_by('id').values_list('id', 'name', 'price', 'countInStock'))
+
+    def test_import_is_idempotent(self):
+        self.write([
+            {'id': 9001, 'name': 'One', 'price': 1.5, 'countInStock': 3, 'brand': 'Acme'},
+            {'id': 9002, 'name': 'Two', 'price': 2, 'countInStock': 0, 'rating': 4, 'numReviews': 2},
+        ])
+        total = Product.objects.count()
+        self.run_import()
+        first = self.catalog()
+        self.assertEqual(first, [(9001, 'One', 1.5, 3), (9002, 'Two', 2.0, 0)])
+
+        self.run_import()
+        self.assertEqual(self.catalog(), first)
+        self.assertEqual(Product.objects.count(), total + 2)
+
+    def test_reimport_updates_but_keeps_review_aggregates(self):
+        self.write([{'id': 9001, 'name': 'One', 'price': 1, 'rating': 4, 'numReviews': 2}])
+        self.run_import()
+        self.write([{'id': 9001, 'name': 'One v2', 'price': 3, 'rating': 1, 'numReviews': 9}])
+        self.run_import()
+        product = Product.objects.get(id=9001)
+        self.assertEqual((product.name, product.price), ('One v2', 3))
+        self.assertEqual((product.rating, product.numReviews), (4, 2))
+
+    def test_imported_rows_are_searchable(self):
+        self.write([{'id': 9001, 'name': 'Zyzzyvaphone'}])
+        self.run_import()
+        self.run_import()
+        cache.clear()
+        response = self.client.get('/api/products/?q=zyzzy')
+        self.assertEqual([row['_id'] for row in response.json()['results']], [9001])
+
+
+class PercentileTests(TestCase):
+
+    def test_nearest_rank(self):
+        self.assertEqual(percentile(list(range(1, 21)), 95), 19)
+        self.assertEqual(percentile(list(range(1, 19)), 50), 9)
+        self.assertEqual(percentile(list(range(1, 101)), 95), 95)
+        self.assertEqual(percentile(list(range(1, 11)), 100), 10)
+        self.assertEqual(percentile([7], 1), 7)
+        self.assertIsNone(percentile([], 50))
@@ -0,0 +1,43 @@
+from django.utils.module_loading import import_string
+
+
+class LazyView():
+    """
+    URL pattern callback that imports its view on the first request.
+
+    Loading the URLconf then costs nothing beyond this module, so a cold
+    start (a fresh serverless instance) only imports the views, serializers
+    and services of the route it is actually serving. Class-based views
+    are given as the class path and turned into a view with as_view().
+
+    CsrfViewMiddleware reads `csrf_exempt` in process_view, before the view
+    is imported, so it has to be declared up front. It defaults to True
+    because DRF views (@api_view, APIView.as_view()) are always exempt;
+    pass csrf_exempt=False for plain Django views.
+    """
+
+    def __init__(self, dotted_path, csrf_exempt=True):
+        self.dotted_path = dotted_path
+        self.csrf_exempt = csrf_exempt
+        # read by URLPattern.lookup_str when the resolver populates; must not import the view
+        self.__module__, _, self.__qualname__ = dotted_path.rpartition('.')
+        self.__name__ = self.__qualname__
+        self._view = None
+
+    def resolve(self):
+        if self._view is None:
+            view = import_string(self.dotted_path)
+            if isinstance(view, type) and hasattr(view, 'as_view'):
+                view = view.as_view()
+            self._view = view
+        return self._view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.resolve()(request, *args, **kwargs)
+
+    def __repr__(self):
+        return f'<LazyView {self.dotted_path}>'
+
+
+def lazy_view(dotted_path, csrf_exempt=True):
+    return LazyView(dotted_path, csrf_exempt=csrf_exempt)
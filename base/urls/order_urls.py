@@ -1,7 +1,8 @@
 from django.urls import path
-from base.views import order_views
+from base.urls.lazy import lazy_view
 
 urlpatterns = [
-    path('', order_views.order_list_create, name="order_list"),
-    path('<pk>', order_views.order_details, name="order_details")
-]
\ No newline at end of file
+    path('', lazy_view('base.views.order_views.order_list_create'), name="order_list"),
+    path('history/', lazy_view('base.views.order_views.order_history'), name="order_history"),
+    path('<pk>', lazy_view('base.views.order_views.order_details'), name="order_details")
+]
@@ -1,17 +1,22 @@
-from django.urls import path
-from base.views import user_views as views
+from django.urls import path, re_path
+from base.urls.lazy import lazy_view
+
+# views are imported on first use (see base/urls/lazy.py)
+views = 'base.views.user_views.'
 
 urlpatterns = [
-    path('login/', views.MyTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path('register/', views.registerUser, name='register'),
+    path('login/', lazy_view(views + 'MyTokenObtainPairView'), name="token_obtain_pair"),
+    path('register/', lazy_view(views + 'registerUser'), name='register'),
 
-    path('profile/', views.getUserProfile, name="users-profile"),
-    path('profile/update/', views.updateUserProfile, name="user-profile-update"),
-    path('', views.getUsers, name="users"),
+    path('profile/', lazy_view(views + 'getUserProfile'), name="users-profile"),
+    path('profile/update/', lazy_view(views + 'updateUserProfile'), name="user-profile-update"),
+    path('', lazy_view(views + 'getUsers'), name="users"),
+    path('bulk/', lazy_view(views + 'bulkUsers'), name="users-bulk"),
+    re_path(r'^export\.(?P<export_format>csv|ndjson)$', lazy_view(views + 'exportUsers'), name="users-export"),
 
-    path('<str:pk>/', views.getUserById, name='user'),
+    path('<str:pk>/', lazy_view(views + 'getUserById'), name='user'),
 
-    path('update/<str:pk>', views.updateUser, name='user-update'),
+    path('update/<str:pk>', lazy_view(views + 'updateUser'), name='user-update'),
 
-    path('delete/<str:pk>/', views.deleteUser, name='user-delete')
-]
\ No newline at end of file
+    path('delete/<str:pk>/', lazy_view(views + 'deleteUser'), name='user-delete')
+]
@@ -1,30 +1,70 @@
-from pathlib import Path
 from django.conf import settings
 from django.http import JsonResponse, HttpResponseBadRequest, Http404
 from rest_framework.decorators import api_view
 
+from ..services.image_catalog_service import ImageCatalogService
+
+MAX_PAGE_SIZE = 500
+
+
+def _truthy(value):
+    return str(value).lower() in ("1", "true", "yes")
+
+
 @api_view(["POST"])
 def images_in_folder(request):
+    """
+    POST /api/images/
+    Body: {"folder": "banners", "recursive": false, "extensions": ["webp", "png"],
+           "page": 1, "page_size": 50}
+
+    Answered from ImageCatalogService's manifest instead of walking
+    MEDIA_ROOT on every call. Without page_size every match is returned.
+    """
     folder = (request.data.get("folder") or "").strip("/")  # subfolder under MEDIA_ROOT
 
-    base = Path(settings.MEDIA_ROOT).resolve()
+    base = ImageCatalogService.root()
     target = (base / folder).resolve()
 
     # simple safety: keep inside MEDIA_ROOT
     if base not in target.parents and base != target:
         return HttpResponseBadRequest("Invalid folder path.")
 
-    if not target.exists() or not target.is_dir():
+    if not target.is_dir():
         raise Http404("Folder not found.")
 
-    exts = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"}
-    results = []
-    for p in target.iterdir():  # non-recursive, simplest
-        if p.is_file() and p.suffix.lower() in exts:
-            rel = p.relative_to(base).as_posix()
-            results.append({
-                "name": p.name,
-                "url": request.build_absolute_uri(settings.MEDIA_URL + rel),
-            })
-
-    return JsonResponse({"folder": folder, "count": len(results), "results": results})
+    extensions = request.data.get("extensions") or []
+    if isinstance(extensions, str):
+        extensions = [ext.strip() for ext in extensions.split(",") if ext.strip()]
+    if not isinstance(extensions, list) or not all(isinstance(ext, str) for ext in extensions):
+        return HttpResponseBadRequest("extensions must be a list of strings.")
+
+    paths = ImageCatalogService.list_images(
+        target.relative_to(base).as_posix() if target != base else "",
+        recursive=_truthy(request.data.get("recursive", False)),
+        extensions=extensions,
+    )
+
+    body = {"folder": folder, "count": len(paths)}
+    page_size = request.data.get("page_size")
+    if page_size:
+        try:
+            page_size = min(max(int(page_size), 1), MAX_PAGE_SIZE)
+            page = max(int(request.data.get("page") or 1), 1)
+        except (TypeError, ValueError):
+            return HttpResponseBadRequest("page and page_size must be integers.")
+        start = (page - 1) * page_size
+        body["page"] = page
+        body["page_size"] = page_size
+        body["has_next"] = start + page_size < len(paths)
+        paths = paths[start:start + page_size]
+
+    body["results"] = [
+        {
+            "name": rel.rsplit("/", 1)[-1],
+            "path": rel,
+            "url": request.build_absolute_uri(settings.MEDIA_URL + rel),
+        }
+        for rel in paths
+    ]
+    return JsonResponse(body)
@@ -0,0 +1,127 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from ..services.blob_service import BlobService
+from ..services.media_service import MediaService
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# types worth serving from a precompressed .br/.gz sibling (see compress_media)
+COMPRESSIBLE_TYPES = {'image/svg+xml', 'application/json', 'text/plain', 'text/css',
+                      'application/javascript', 'text/javascript', 'application/xml', 'text/xml'}
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _precompressed(request, path, content_type, mtime):
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if content_type not in COMPRESSIBLE_TYPES:
+        return None, None
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding in accepted:
+            try:
+                stat = os.stat(path + suffix)
+            except OSError:
+                continue
+            if stat.st_mtime >= mtime:  # stale copies are ignored
+                return path + suffix, encoding
+    return None, None
+
+
+def _byte_range(header, size):
+    """(start, end) inclusive for a single "bytes=" range, None if unsatisfiable."""
+    match = RANGE_RE.match(header.strip())
+    if not match or (not match[1] and not match[2]):
+        return None
+    if match[1]:
+        start = int(match[1])
+        end = min(int(match[2]), size - 1) if match[2] else size - 1
+    else:  # suffix range: the last N bytes
+        start = max(size - int(match[2]), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+def _read_range(path, start, length, chunk_size=64 * 1024):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path):
+    """
+    GET /images/<path>  (also /images/<name>.<content hash>.<ext>)
+
+    Production replacement for django.conf.urls.static: immutable caching
+    for content-hashed URLs, ETag/Last-Modified 304s, precompressed .br/.gz
+    variants, single HTTP byte ranges and FileResponse, so the WSGI server
+    can hand full files to sendfile().
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+
+    resolved = MediaService.resolve(path)
+    if resolved is None:
+        raise Http404('File not found.')
+    name, requested_hash = resolved
+    full_path = MediaService.path(name)
+    stat = os.stat(full_path)
+
+    content_hash = MediaService.content_hash(name)
+    # blob names are content hashes themselves
+    immutable = BlobService.is_blob(name) or (requested_hash is not None and requested_hash == content_hash)
+    cache_control = IMMUTABLE if immutable else f"public, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 300)}"
+    etag = quote_etag(content_hash)
+    last_modified = int(stat.st_mtime)
+
+    def finish(response):
+        response.headers['Cache-Control'] = cache_control
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        response.headers['Accept-Ranges'] = 'bytes'
+        return response
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return finish(not_modified)
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    compressed_path, encoding = _precompressed(request, full_path, content_type, stat.st_mtime)
+    if compressed_path:
+        response = FileResponse(open(compressed_path, 'rb'), content_type=content_type)
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        return finish(response)
+
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = _byte_range(range_header, stat.st_size)
+        if byte_range is None:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{stat.st_size}'
+            return finish(response)
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _read_range(full_path, start, length) if request.method == 'GET' else iter(()),
+            status=206, content_type=content_type,
+        )
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response.headers['Content-Length'] = str(length)
+        return finish(response)
+
+    # FileResponse -> wsgi.file_wrapper -> sendfile() on servers that support it
+    return finish(FileResponse(open(full_path, 'rb'), content_type=content_type))
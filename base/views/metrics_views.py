@@ -0,0 +1,18 @@
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from ..services.metrics_service import MetricsService
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    """
+    GET /api/metrics/
+    Per-route latency / query-count histograms in Prometheus text format.
+    """
+    return HttpResponse(
+        MetricsService.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -1,5 +1,6 @@
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Max
 from rest_framework.decorators import api_view, permission_classes, parser_classes
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -8,8 +9,16 @@ from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
 
 from ..models import Product
-from ..serializers import ProductSerializer, ProductUpdateSerializer
+from ..filters import ProductOrderingFilter, ProductRangeFilter
+from ..pagination import KeysetPaginator
+from ..serializers import ProductSerializer, ProductListSerializer, ProductUpdateSerializer, ProductImageStatusSerializer
 from ..signals import seed_products_if_empty
+from ..services.search_service import ProductSearchService
+from ..services.cache_service import ProductCacheService, cache_anonymous_get, conditional_get
+from ..services.stock_service import StockService
+from ..services.job_service import JobService
+from ..services.blob_service import BlobService
+from ..services.facet_service import FacetService
 
 
 # Helper: small paginator you can reuse
@@ -19,40 +28,85 @@ class SmallPaginator(PageNumberPagination):
     max_page_size = 100
 
 
+def _wants_cursor_pagination(request):
+    params = request.query_params
+    return params.get('pagination') == 'cursor' or KeysetPaginator.cursor_query_param in params
+
+
+def _filter_products(request):
+    qs = Product.objects.all()
+
+    # ---- optional filters/search ----
+    q = request.query_params.get('q')
+    brand = request.query_params.get('brand')
+    category = request.query_params.get('category')
+    # e.g. "price" or "-price"; only sort keys with an index (see base/filters.py)
+    ordering = ProductOrderingFilter().get_ordering(request)
+
+    if q:
+        # full-text index lookup, ranked by relevance (see search_service)
+        qs = ProductSearchService.search(qs, q)
+    # indexed, case-normalized columns instead of iexact (see Product.brandKey)
+    if brand:
+        qs = qs.filter(brandKey=FacetService.key(brand))
+    if category:
+        qs = qs.filter(categoryKey=FacetService.key(category))
+    # ?min_price= / ?max_price= / ?min_rating=
+    qs = ProductRangeFilter().filter_queryset(request, qs)
+    if ordering:
+        qs = qs.order_by(*ordering)
+    elif q:
+        qs = ProductSearchService.order_by_rank(qs)
+    return qs
+
+
+def _product_list_fingerprint(request):
+    # newest write + row count of the filtered set, plus the params that
+    # select the page; one aggregate query instead of serializing the page
+    stats = _filter_products(request).order_by().aggregate(last=Max('updatedAt'), total=Count('id'))
+    source = f"products:{request.get_host()}:{ProductCacheService.normalized_query(request)}:" \
+             f"{stats['total']}:{stats['last'] and stats['last'].isoformat()}"
+    return source, stats['last']
+
+
+def _product_detail_fingerprint(request, pk):
+    updated = Product.objects.filter(pk=pk).values_list('updatedAt', flat=True).first()
+    if updated is None:
+        return None
+    return f'product:{pk}:{updated.isoformat()}', updated
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticatedOrReadOnly])   # Anyone can read; auth required to POST
+@cache_anonymous_get(ProductCacheService.list_key)   # a cache hit skips the fingerprint query
+@conditional_get(_product_list_fingerprint)
 def product_list_create(request):
     """
     GET  /api/products/?q=airpods&brand=Apple&category=Electronics&ordering=price
+    GET  /api/products/?min_price=25&max_price=100&min_rating=4&ordering=-rating
+    GET  /api/products/?pagination=cursor[&cursor=...][&count=true]
+    GET  /api/products/?fields=_id,name,image,price,rating
     POST /api/products/
+
+    Cursor mode always walks the catalog newest first (createdAt, id), so
+    `ordering` and search relevance are ignored there.
     """
     if request.method == 'GET':
-        qs = Product.objects.all()
-
-        # ---- optional filters/search ----
-        q = request.query_params.get('q')
-        brand = request.query_params.get('brand')
-        category = request.query_params.get('category')
-        ordering = request.query_params.get('ordering')  # e.g. "price" or "-price"
-
-        if q:
-            qs = qs.filter(
-                Q(name__icontains=q) |
-                Q(description__icontains=q) |
-                Q(brand__icontains=q) |
-                Q(category__icontains=q)
-            )
-        if brand:
-            qs = qs.filter(brand__iexact=brand)
-        if category:
-            qs = qs.filter(category__iexact=category)
-        if ordering:
-            qs = qs.order_by(ordering)
+        qs = _filter_products(request)
+        paginator = KeysetPaginator() if _wants_cursor_pagination(request) else SmallPaginator()
+
+        # ---- sparse fieldsets: only load the columns being sent ----
+        fields = ProductSerializer.sparse_fields(request)
+        if fields:
+            columns = ProductSerializer.columns(fields)
+            if isinstance(paginator, KeysetPaginator):
+                # the cursor is built from these
+                columns += [name.lstrip('-') for name in paginator.ordering]
+            qs = qs.only(*columns)
 
         # ---- pagination ----
-        paginator = SmallPaginator()
         page = paginator.paginate_queryset(qs, request)
-        serializer = ProductSerializer(page, many=True, context={'request': request})
+        serializer = ProductListSerializer(page, context={'request': request}, fields=fields)
         return paginator.get_paginated_response(serializer.data)
 
     # POST
@@ -63,8 +117,28 @@ def product_list_create(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def product_facets(request):
+    """
+    GET /api/products/facets/?q=&brand=&category=&min_price=&max_price=&min_rating=
+
+    Sidebar counts per brand, category and price bucket for the same
+    filters the product list takes (see base/services/facet_service.py).
+    """
+    params = request.query_params
+    return Response(FacetService.facets(
+        q=(params.get('q') or '').strip(),
+        brand=params.get('brand'),
+        category=params.get('category'),
+        ranges=ProductRangeFilter().get_lookups(request),
+    ))
+
+
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticatedOrReadOnly])   # tighten as needed (e.g., IsAdminUser for writes)
+@cache_anonymous_get(ProductCacheService.detail_key)   # a cache hit skips the fingerprint query
+@conditional_get(_product_detail_fingerprint)
 def product_detail(request, pk: int):
     """
     GET    /api/products/<pk>/
@@ -101,9 +175,23 @@ def product_detail(request, pk: int):
 def product_update_stock(request, pk: int):
     """
     PATCH /api/products/<pk>/stock/
-    Body: { "countInStock": 7 }
+    Body: { "countInStock": 7 }   set the stock
+      or: { "delta": -2 }         add/remove stock atomically (never below 0)
     """
     product = get_object_or_404(Product, pk=pk)
+
+    if 'delta' in request.data:
+        try:
+            delta = int(request.data.get('delta'))
+        except (TypeError, ValueError):
+            return Response({"detail": "delta must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # UPDATE ... SET countInStock = countInStock + delta, no read-modify-write
+        if not StockService.adjust(product.pk, delta):
+            return Response({"detail": "Insufficient stock."}, status=status.HTTP_409_CONFLICT)
+        product.refresh_from_db()
+        return Response(ProductSerializer(product).data, status=status.HTTP_200_OK)
+
     count = request.data.get('countInStock', None)
     if count is None:
         return Response({"detail": "countInStock is required."}, status=status.HTTP_400_BAD_REQUEST)
@@ -117,34 +205,49 @@ def product_update_stock(request, pk: int):
         return Response({"detail": "countInStock must be ≥ 0."}, status=status.HTTP_400_BAD_REQUEST)
 
     product.countInStock = count
-    product.save(update_fields=['countInStock'])
+    product.save(update_fields=['countInStock', 'updatedAt'])
     return Response(ProductSerializer(product).data, status=status.HTTP_200_OK)
 
-@api_view(["POST"])
-@permission_classes([IsAuthenticated])  # tighten to IsAdminUser if only admins can upload
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticatedOrReadOnly])  # tighten to IsAdminUser if only admins can upload
 @parser_classes([MultiPartParser, FormParser])  # enables request.FILES
 def upload_product_image(request, pk):
     """
     Upload/replace the image for a product.
-    POST /api/products/<pk>/upload-image/
+    POST /api/products/<pk>/image/
     Body: multipart/form-data with field 'image'
+
+    Returns 202 right after storing the file; the WebP/AVIF derivatives are
+    built by a background job. Poll GET /api/products/<pk>/image/ until
+    imageStatus is "ready" (or "failed").
     """
-    data = request.data
     product = get_object_or_404(Product, pk=pk)
 
+    if request.method == "GET":
+        return Response(ProductImageStatusSerializer(product, context={'request': request}).data)
+
     file_obj = request.FILES.get("image")
     if not file_obj:
         return Response({"detail": "No file provided. Use field name 'image'."},
                         status=status.HTTP_400_BAD_REQUEST)
 
-    # Optionally: delete old file if replacing (uncomment if desired)
-    # if product.image and product.image.name:
-    #     product.image.delete(save=False)
+    old_name = product.image.name if product.image else None
 
     # Save the new file to the ImageField
-    product.image.save(file_obj.name, file_obj, save=True)
+    with transaction.atomic():
+        product.image.save(file_obj.name, file_obj, save=False)
+        product.imageStatus = 'pending'
+        product.imageHash = ''
+        product.save(update_fields=['image', 'imageStatus', 'imageHash', 'updatedAt'])
 
-    return Response(ProductSerializer(product).data, status=status.HTTP_200_OK)
+        JobService.enqueue('build_image_derivatives', {'product_id': product.pk, 'image': product.image.name})
+        # blobs are reference counted (BlobService); legacy uploads are removed here.
+        # Names starting with "/" are seeded references to bundled static images.
+        if old_name and old_name != product.image.name \
+                and not BlobService.is_blob(old_name) and not old_name.startswith('/'):
+            JobService.enqueue('delete_media_files', {'names': [old_name]})
+
+    return Response(ProductSerializer(product).data, status=status.HTTP_202_ACCEPTED)
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -0,0 +1,42 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from ..models import Product
+from ..pagination import KeysetPaginator
+from ..serializers import ReviewSerializer
+from ..services.review_service import AlreadyReviewed, ReviewService
+
+
+class ReviewPaginator(KeysetPaginator):
+    page_size = 10
+    max_page_size = 50
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def product_reviews(request, pk: int):
+    """
+    GET  /api/products/<pk>/reviews/[?cursor=...][&page_size=20][&count=true]
+    POST /api/products/<pk>/reviews/  {"rating": 1-5, "comment": "..."}
+
+    POST also updates the product's rating / numReviews in the same transaction.
+    """
+    if request.method == 'GET':
+        if not Product.objects.filter(pk=pk).exists():
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        paginator = ReviewPaginator()
+        page = paginator.paginate_queryset(ReviewService.reviews_for(pk), request)
+        return paginator.get_paginated_response(ReviewSerializer(page, many=True).data)
+
+    try:
+        review = ReviewService.create_review(request.user, pk, request.data)
+    except ValidationError as e:
+        return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+    except Product.DoesNotExist:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    except AlreadyReviewed:
+        return Response({'detail': 'Product already reviewed'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(ReviewSerializer(review).data, status=status.HTTP_201_CREATED)
@@ -1,20 +1,27 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from django.http import StreamingHttpResponse
 from base.serializers import UserSerializerWithToken, UserSerializer
+from base.serializers import MyTokenObtainPairSerializer as ClaimsTokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth.models import User
-from django.contrib.auth.hashers import make_password
 from rest_framework import status
 from base.services.validation_service import ValidationService
+from base.services.user_cache_service import UserCacheService
+from base.services.password_service import PasswordService
+from base.services.user_admin_service import UserAdminService
+from base.pagination import KeysetPaginator
 
 
-class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+class MyTokenObtainPairSerializer(ClaimsTokenObtainPairSerializer):
     def validate(self, attrs):
         data = super().validate(attrs)
 
-        serializer = UserSerializerWithToken(self.user).data
+        # reuse the access token just minted instead of minting a second pair
+        serializer = UserSerializerWithToken(self.user, context={'token': data['access']}).data
         for k, v in serializer.items():
             data[k] = v
         
@@ -32,7 +39,7 @@ def registerUser(request):
             first_name=data['name'],
             username=data['email'],
             email=data['email'],
-            password=make_password(data['password'])
+            password=PasswordService.make_password(data['password'])
     )
 
         serializer = UserSerializerWithToken(user, many=False)
@@ -46,7 +53,8 @@ def registerUser(request):
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def updateUserProfile(request):
-    user = request.user
+    # request.user may be built from token claims; load the row we're going to save
+    user = UserCacheService.model(request.user, cached=False)
     serializer = UserSerializerWithToken(user, many=False)
 
     # request's body
@@ -60,7 +68,7 @@ def updateUserProfile(request):
 
     if data['password'] != '':
         # hashing password
-        user.password = make_password(data['password'])
+        user.password = PasswordService.make_password(data['password'])
 
     user.save()
 
@@ -75,12 +83,77 @@ def getUserProfile(request):
     return Response(serializer.data)
 
 
+class UserPaginator(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class UserKeysetPaginator(KeysetPaginator):
+    page_size = 50
+    max_page_size = 500
+    ordering = ('-date_joined', '-id')
+
+
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def getUsers(request):
-    users = User.objects.all()
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data)
+    """
+    GET /api/users/?page=2[&page_size=100]
+    GET /api/users/?pagination=cursor[&cursor=...][&count=true]
+    Filters: ?q=, ?is_staff=, ?is_active=, ?ordering=date_joined|-email|...
+
+    Without any pagination parameter the whole (filtered) list is returned
+    as before, for existing clients; prefer a paginated request.
+    """
+    users = UserAdminService.filter_users(request.query_params)
+    users = users.only('id', 'username', 'email', 'first_name', 'is_staff', 'date_joined')
+
+    params = request.query_params
+    if params.get('pagination') == 'cursor' or 'cursor' in params:
+        paginator = UserKeysetPaginator()
+    elif 'page' in params or 'page_size' in params:
+        paginator = UserPaginator()
+    else:
+        return Response(UserSerializer(users, many=True).data)
+
+    page = paginator.paginate_queryset(users, request)
+    return paginator.get_paginated_response(UserSerializer(page, many=True).data)
+
+
+@api_view(['PATCH', 'DELETE'])
+@permission_classes([IsAdminUser])
+def bulkUsers(request):
+    """
+    PATCH  /api/users/bulk/  {"ids": [1, 2, 3], "is_active": false}   -> {"updated": 3}
+    DELETE /api/users/bulk/  {"ids": [4, 5]}                         -> {"deleted": 2}
+
+    One UPDATE for the whole batch (is_staff / is_active), or one DELETE
+    plus its cascades; up to 1000 ids per request.
+    """
+    try:
+        batch = UserAdminService.validate_bulk(request.data, request.user, delete=request.method == 'DELETE')
+    except ValidationError as e:
+        return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.method == 'PATCH':
+        return Response({'updated': UserAdminService.bulk_update(batch['ids'], batch['fields'])})
+    return Response({'deleted': UserAdminService.bulk_delete(batch['ids'])})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def exportUsers(request, export_format):
+    """
+    GET /api/users/export.csv
+    GET /api/users/export.ndjson
+    Same filters as the user list. Streamed row by row.
+    """
+    users = UserAdminService.filter_users(request.query_params)
+    content_type = 'text/csv; charset=utf-8' if export_format == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(UserAdminService.export_rows(users, export_format), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="users.{export_format}"'
+    return response
 
 
 @api_view(['GET'])